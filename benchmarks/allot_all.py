@@ -0,0 +1,39 @@
+from benchmarks import workload
+from config import config
+from src.engine import Engine
+import collections
+import time
+
+
+def _prepare(offerings: int, registrations: int) -> tuple:
+    lines = [line for line in workload.generate(
+        offerings=offerings, registrations=registrations)
+        if not line.startswith(config.ALLOT)]
+    engine = Engine()
+    collections.deque(engine.execute_many(lines), maxlen=0)
+    return engine, list(engine.courses)
+
+def _single(offerings: int, registrations: int) -> float:
+    engine, course_ids = _prepare(offerings, registrations)
+    lines = [f"{config.ALLOT} {course_id}\n" for course_id in course_ids]
+    consume = collections.deque(maxlen=0).extend
+    start = time.perf_counter()
+    for result in engine.execute_many(lines):
+        consume(result)
+    return time.perf_counter() - start
+
+def _batch(offerings: int, registrations: int) -> float:
+    engine, _ = _prepare(offerings, registrations)
+    start = time.perf_counter()
+    collections.deque(engine.execute(f"{config.ALLOT_ALL}\n"), maxlen=0)
+    return time.perf_counter() - start
+
+def main(offerings: int=20000, registrations: int=5) -> None:
+    before = _single(offerings=offerings, registrations=registrations)
+    after = _batch(offerings=offerings, registrations=registrations)
+    print(f"{offerings} offerings x {registrations} registrations")
+    print(f"ALLOT per offering: {before:.3f}s")
+    print(f"ALLOT-ALL:          {after:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from benchmarks.run import percentile_value
+from config import config
+from src.constants import Constants
+from src.ingest import AsyncIngestor
+import asyncio
+import random
+import time
+
+
+async def _producer(ingestor: AsyncIngestor, producer: int, commands: int,
+                    course_ids: list, latencies: list, seed: int) -> None:
+    rand = random.Random(seed + producer)
+    registered = []
+    for i in range(commands):
+        if registered and rand.random() < 0.3:
+            line = f"{config.CANCEL} {registered.pop()}"
+        else:
+            offering = rand.randrange(len(course_ids))
+            line = (f"{config.REGISTER} P{producer}E{i}@EMAIL.COM"
+                    f" {course_ids[offering]}")
+        start = time.perf_counter_ns()
+        result = await ingestor.submit(line)
+        latencies.append(time.perf_counter_ns() - start)
+        if result.endswith(f" {Constants.STATUS_ACCEPTED}"):
+            registered.append(result.split()[0])
+
+async def _load(producers: int, commands: int, offerings: int,
+                capacity: int, seed: int) -> tuple:
+    latencies = []
+    async with AsyncIngestor() as ingestor:
+        course_ids = [
+            await ingestor.submit(f"{config.ADD} TITLE{i} INSTRUCTOR"
+                                  f" 05062022 1 {capacity}")
+            for i in range(offerings)
+        ]
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _producer(ingestor, producer, commands, course_ids, latencies,
+                      seed) for producer in range(producers)))
+        seconds = time.perf_counter() - start
+    for course in ingestor.engine.courses.values():
+        assert course.slots_left == \
+            course.max_emp - len(course.course_registered_ids)
+    return seconds, latencies
+
+def main(producers: int=200, commands: int=500, offerings: int=10,
+         capacity: int=2000, seed: int=0) -> None:
+    seconds, latencies = asyncio.run(_load(
+        producers=producers, commands=commands, offerings=offerings,
+        capacity=capacity, seed=seed))
+    latencies.sort()
+    print(f"{producers} producers x {commands} commands"
+          f" on {offerings} offerings")
+    print(f"throughput: {len(latencies) / seconds:,.0f} commands/s")
+    for percentile in (50, 99, 99.9):
+        print(f"p{percentile} latency: "
+              f"{percentile_value(latencies, percentile) / 1e3:,.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from benchmarks import workload
+from src import register, add, cancel, allot
+from src.engine import Engine
+from config import config
+from utils import utils
+from utils import exceptions
+import collections
+import time
+
+
+def _per_line_handlers(lines: list) -> float:
+    operations = {
+        config.ADD: add.Add,
+        config.REGISTER: register.Register,
+        config.ALLOT: allot.Allot,
+        config.CANCEL: cancel.Cancel
+    }
+    consume = collections.deque(maxlen=0).extend
+    start = time.perf_counter()
+    courses, course_registrations = {}, {}
+    for line in lines:
+        cmd_args = utils.detect_command(line)
+        try:
+            command, params = utils.validate_command(cmd_args)
+        except exceptions.INPUT_DATA_ERROR:
+            continue
+        object = operations[command](courses, course_registrations)
+        result = object.execute(*params)
+        if not isinstance(result, str):
+            consume(result)
+        courses, course_registrations = object.courses, object.course_reg
+    return time.perf_counter() - start
+
+def _engine(lines: list) -> float:
+    consume = collections.deque(maxlen=0).extend
+    start = time.perf_counter()
+    for result in Engine().execute_many(lines):
+        if not isinstance(result, str):
+            consume(result)
+    return time.perf_counter() - start
+
+def main(offerings: int=2000, registrations: int=100) -> None:
+    lines = list(workload.generate(offerings=offerings,
+                                   registrations=registrations))
+    before = _per_line_handlers(lines=lines)
+    after = _engine(lines=lines)
+    print(f"commands: {len(lines)}")
+    print(f"per-line handlers: {before:.3f}s"
+          f" ({1e6 * before / len(lines):.2f} us/command)")
+    print(f"engine:            {after:.3f}s"
+          f" ({1e6 * after / len(lines):.2f} us/command)")
+
+if __name__ == "__main__":
+    main()
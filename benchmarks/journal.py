@@ -0,0 +1,49 @@
+from benchmarks import workload
+from src import journal
+from src.engine import Engine
+import collections
+import os
+import tempfile
+import time
+
+
+def _run(lines: list, directory: str=None, **kwargs) -> float:
+    engine = Engine()
+    if directory is not None:
+        engine.journal = journal.Journal(directory=directory, engine=engine,
+                                         **kwargs)
+    start = time.perf_counter()
+    collections.deque(engine.execute_many(lines), maxlen=0)
+    if engine.journal is not None:
+        engine.journal.close()
+    return time.perf_counter() - start
+
+def _recover(directory: str) -> float:
+    start = time.perf_counter()
+    journal.recover(directory=directory)
+    return time.perf_counter() - start
+
+def main(offerings: int=2000, registrations: int=100) -> None:
+    lines = list(workload.generate(offerings=offerings,
+                                   registrations=registrations))
+    print(f"commands: {len(lines)}")
+    baseline = _run(lines=lines)
+    print(f"no journal:                 {baseline:.3f}s")
+    with tempfile.TemporaryDirectory() as directory:
+        seconds = _run(lines=lines[:2000], directory=directory, batch_size=1)
+        print(f"fsync every record:         {seconds * len(lines) / 2000:.3f}s"
+              " (extrapolated from 2000 commands)")
+    with tempfile.TemporaryDirectory() as directory:
+        seconds = _run(lines=lines, directory=directory)
+        print(f"group commit:               {seconds:.3f}s"
+              f" (+{100 * (seconds - baseline) / baseline:.0f}%)")
+        print(f"recover from journal:       {_recover(directory):.3f}s")
+    with tempfile.TemporaryDirectory() as directory:
+        seconds = _run(lines=lines, directory=directory,
+                       compact_after=len(lines) // 4)
+        print(f"group commit + compaction:  {seconds:.3f}s")
+        print(f"recover from snapshot:      {_recover(directory):.3f}s"
+              f" ({len(os.listdir(directory))} files)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from benchmarks import workload
+from src import ids
+from src.constants import Constants
+from src.engine import Engine
+from src.records import Offering, Registration
+from utils import utils
+import functools
+import gc
+import tracemalloc
+
+
+def _dict_layout(offerings: int, registrations: int) -> tuple:
+    courses, course_reg = {}, {}
+    for i in range(offerings):
+        course_id = f"OFFERING-TITLE{i}-INSTRUCTOR"
+        courses[course_id] = {
+            Constants.title: f"TITLE{i}",
+            Constants.instructor: "INSTRUCTOR",
+            Constants.min_emp: 1,
+            Constants.max_emp: registrations,
+            Constants.slots_left: 0,
+            Constants.date: "05062022",
+            Constants.final_status: None,
+            Constants.alloted: False,
+            Constants.course_registered_ids: set()
+        }
+        for j in range(registrations):
+            reg_id = f"REG-COURSE-EMP{j}-TITLE{i}"
+            course_reg[reg_id] = {
+                Constants.course_id: course_id,
+                Constants.email_id: f"EMP{j}@EMAIL.COM"
+            }
+            courses[course_id][Constants.course_registered_ids].add(reg_id)
+    return courses, course_reg
+
+def _record_layout(offerings: int, registrations: int) -> tuple:
+    courses, course_reg = {}, {}
+    for i in range(offerings):
+        course_id = f"OFFERING-TITLE{i}-INSTRUCTOR"
+        courses[course_id] = Offering(f"TITLE{i}", "INSTRUCTOR", 1,
+                                      registrations, 0, "05062022")
+        for j in range(registrations):
+            reg_id = f"REG-COURSE-EMP{j}-TITLE{i}"
+            course_reg[reg_id] = Registration(course_id, f"EMP{j}@EMAIL.COM")
+            courses[course_id].course_registered_ids.add(reg_id)
+    return courses, course_reg
+
+def measure(build, offerings: int, registrations: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    state = build(offerings, registrations)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return size
+
+def _engine_state(offerings: int, registrations: int,
+                  shared_employees: bool) -> Engine:
+    ids.cache_clear()
+    utils._intern.cache_clear()
+    engine = Engine()
+    for _ in engine.execute_many(workload.generate(
+            offerings=offerings, registrations=registrations,
+            shared_employees=shared_employees)):
+        pass
+    return engine
+
+def _engine_state_not_interned(offerings: int, registrations: int,
+                               shared_employees: bool) -> Engine:
+    table = dict(utils._COMMAND_TABLE)
+    utils._COMMAND_TABLE.update({
+        name: (arity, tuple(str.strip if convert is utils._intern else
+                            convert for convert in converters), check)
+        for name, (arity, converters, check) in table.items()})
+    try:
+        return _engine_state(offerings, registrations, shared_employees)
+    finally:
+        utils._COMMAND_TABLE.update(table)
+
+def _measure_engine(build, offerings: int, registrations: int,
+                    shared_employees: bool) -> int:
+    return measure(functools.partial(build, shared_employees=shared_employees),
+                   offerings, registrations)
+
+def main(offerings: int=1000, registrations: int=1000) -> None:
+    before = measure(_dict_layout, offerings, registrations)
+    after = measure(_record_layout, offerings, registrations)
+    print(f"{offerings} offerings x {registrations} registrations")
+    print(f"dict records:    {before / 2 ** 20:8.1f} MiB")
+    print(f"slotted records: {after / 2 ** 20:8.1f} MiB"
+          f" ({100 * (before - after) / before:.0f}% less)")
+    for shared_employees in (True, False):
+        before = _measure_engine(_engine_state_not_interned, offerings,
+                                 registrations, shared_employees)
+        after = _measure_engine(_engine_state, offerings, registrations,
+                                shared_employees)
+        print("shared employees" if shared_employees else
+              "distinct employees")
+        print(f"engine state:    {before / 2 ** 20:8.1f} MiB")
+        print(f"interned:        {after / 2 ** 20:8.1f} MiB"
+              f" ({100 * (before - after) / before:.0f}% less)")
+        for name, (hits, misses, rate) in ids.cache_stats().items():
+            print(f"{name:<16} {hits:>10} hits {misses:>10} misses"
+                  f" {'-' if rate is None else f'{rate:.1%}':>7}")
+
+if __name__ == "__main__":
+    main()
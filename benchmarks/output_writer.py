@@ -0,0 +1,49 @@
+from utils import output
+import contextlib
+import os
+import time
+
+
+def _results(commands: int, lines_per_allot: int) -> list:
+    allotment = [
+        f"REG-COURSE-EMP{i}-TITLE EMP{i}@EMAIL.COM OFFERING-TITLE-INSTRUCTOR"
+        f" TITLE INSTRUCTOR 05062022 CONFIRMED" for i in range(lines_per_allot)
+    ]
+    results = []
+    for i in range(commands):
+        results.append(f"REG-COURSE-EMP{i}-TITLE ACCEPTED")
+        if i % 100 == 0:
+            results.append(allotment)
+    return results
+
+def _legacy_print_output(result) -> None:
+    """How geektrust printed results before the buffered output writer"""
+    res_type = {str: result, tuple: "\n".join(result), list: "\n".join(result)}
+    print(res_type.get(type(result)))
+
+def _print_output(results: list, sink) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        for result in results:
+            _legacy_print_output(result=result)
+    return time.perf_counter() - start
+
+def _output_writer(results: list, sink) -> float:
+    start = time.perf_counter()
+    with output.OutputWriter(stream=sink) as writer:
+        for result in results:
+            writer.write(result)
+    return time.perf_counter() - start
+
+def main(commands: int=200000, lines_per_allot: int=2000) -> None:
+    results = _results(commands=commands, lines_per_allot=lines_per_allot)
+    lines = sum(1 if isinstance(r, str) else len(r) for r in results)
+    with open(os.devnull, 'w') as sink:
+        before = _print_output(results=results, sink=sink)
+        after = _output_writer(results=results, sink=sink)
+    print(f"lines written: {lines}")
+    print(f"print_output:  {before:.3f}s ({lines / before:,.0f} lines/s)")
+    print(f"OutputWriter:  {after:.3f}s ({lines / after:,.0f} lines/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from benchmarks import workload
+from src import parallel
+from src.engine import Engine
+import os
+import time
+
+
+def _serial(lines: list) -> tuple:
+    start = time.perf_counter()
+    outputs = [parallel._render(result)
+               for result in Engine().execute_many(lines)]
+    return time.perf_counter() - start, outputs
+
+def _parallel(lines: list, workers: int) -> tuple:
+    start = time.perf_counter()
+    outputs = list(parallel.execute_many(lines=lines, workers=workers))
+    return time.perf_counter() - start, outputs
+
+def main(offerings: int=2000, registrations: int=200,
+         max_workers: int=None) -> None:
+    lines = list(workload.generate(offerings=offerings,
+                                   registrations=registrations))
+    baseline, expected_outputs = _serial(lines=lines)
+    print(f"commands: {len(lines)}")
+    print(f"serial:    {baseline:.3f}s")
+    for workers in range(2, (max_workers or os.cpu_count() or 1) + 1):
+        seconds, outputs = _parallel(lines=lines, workers=workers)
+        assert outputs == expected_outputs
+        print(f"{workers:2d} workers: {seconds:.3f}s"
+              f" (speedup {baseline / seconds:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+from benchmarks import workload
+from config import config
+from utils import exceptions
+from utils import utils
+import datetime
+import time
+
+
+def _legacy_validate_add(args: list, command: str) -> None:
+    if command != config.ADD:
+        return
+    err_message = ""
+    try:
+        _date, _min, _max = args[-3], args[-2], args[-1]
+        err_message = "Minimum one enrollment must be done"
+        assert _min >= 1
+        err_message = "Max employees can not be less than min employees"
+        assert _min <= _max
+        err_message = "Date should be specified in ddmmyyyy format"
+        assert len(_date) == 8
+        _ = datetime.datetime(day=int(_date[:2]),
+                                month=int(_date[2:4]),
+                                year=int(_date[4:]))
+    except AssertionError:
+        raise exceptions.INPUT_DATA_ERROR(message=err_message)
+    except Exception as err:
+        raise exceptions.INPUT_DATA_ERROR(message=err)
+
+def _legacy_validate_command(args: list) -> list:
+    """The parser geektrust used before the table-driven fast path"""
+    try:
+        cmd_name = args[0]
+        updated_args = args[1:]
+        cmd_metadata = config.COMMANDS_METADATA.get(cmd_name)
+        err_message = (
+            "Please specify a valid command and ensure its argument"
+            " are in correct order. List of valid commands and the"
+            f" parameters they support:\n{config.SUPPORTED_COMMANDS}"
+        )
+        assert cmd_metadata
+        assert len(cmd_metadata) == len(updated_args)
+
+        updated_args = [
+            typ(val.strip()) if not isinstance(val, typ) else val.strip() \
+                for typ, val in zip(cmd_metadata, updated_args)
+        ]
+
+        _legacy_validate_add(args=updated_args, command=cmd_name)
+        return cmd_name, updated_args
+    except AssertionError:
+        raise exceptions.INPUT_DATA_ERROR(message=err_message)
+    except Exception as err:
+        raise err
+
+def _legacy(lines: list) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        try:
+            _legacy_validate_command(utils.detect_command(line))
+        except exceptions.INPUT_DATA_ERROR:
+            pass
+    return time.perf_counter() - start
+
+def _fast_path(lines: list) -> float:
+    parse_line = utils.parse_line
+    start = time.perf_counter()
+    for line in lines:
+        parse_line(line)
+    return time.perf_counter() - start
+
+def main(offerings: int=2000, registrations: int=100) -> None:
+    lines = list(workload.generate(offerings=offerings,
+                                   registrations=registrations))
+    lines += ["ADD-COURSE-OFFERING X Y 31022022 1 2\n", "ALLOT\n"] * 1000
+    before = _legacy(lines=lines)
+    after = _fast_path(lines=lines)
+    print(f"lines parsed: {len(lines)}")
+    print(f"legacy parser: {len(lines) / before:12,.0f} lines/s")
+    print(f"fast path:     {len(lines) / after:12,.0f} lines/s")
+
+if __name__ == "__main__":
+    main()
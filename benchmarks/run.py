@@ -0,0 +1,168 @@
+from benchmarks import workload
+from src.engine import Engine
+from utils import utils
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+_PERCENTILES = (50, 90, 99, 99.9)
+# metrics where a larger value is an improvement
+_HIGHER_IS_BETTER = {"lines_per_second"}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_BASE_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def percentile_value(samples: list, percentile: float) -> float:
+    index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+    return samples[index]
+
+def end_to_end(path: str, lines: int, repeat: int) -> dict:
+    """Runs `python3 -m geektrust` on a file, keeping the fastest run
+
+    Returns:
+        dict: wall time, throughput and peak RSS of the child process.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "geektrust", path, "-o", os.devnull],
+            cwd=_BASE_DIR)
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode:
+            raise RuntimeError(f"geektrust exited with {process.returncode}")
+        if best is None or seconds < best["seconds"]:
+            best = {
+                "seconds": seconds,
+                "lines_per_second": lines / seconds,
+                # ru_maxrss is in kilobytes on Linux and bytes on macOS
+                "peak_rss_mib": usage.ru_maxrss / (
+                    2 ** 20 if sys.platform == "darwin" else 2 ** 10),
+            }
+    return best
+
+def latencies(path: str) -> dict:
+    """Times every command in-process, grouped by command type
+
+    Returns:
+        dict: count and latency percentiles in microseconds per command.
+    """
+    engine = Engine()
+    samples = {}
+    clock = time.perf_counter_ns
+    with open(path) as file_handle:
+        for line in file_handle:
+            start = clock()
+            result = engine.execute(line)
+            if not isinstance(result, str) and result is not None:
+                for _ in result:
+                    pass
+            elapsed = clock() - start
+            parsed = utils.parse_line(line)
+            command = parsed[0] if parsed else "INPUT_DATA_ERROR"
+            samples.setdefault(command, []).append(elapsed)
+    report = {}
+    for command, values in sorted(samples.items()):
+        values.sort()
+        report[command] = {"count": len(values)}
+        for percentile in _PERCENTILES:
+            report[command][f"p{percentile}_us"] = \
+                percentile_value(values, percentile) / 1000
+        report[command]["max_us"] = values[-1] / 1000
+    return report
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Lists the metrics that regressed by more than threshold percent"""
+    regressions = []
+    for name, value in current["end_to_end"].items():
+        before = baseline.get("end_to_end", {}).get(name)
+        if not before:
+            continue
+        change = 100 * (value - before) / before
+        if name in _HIGHER_IS_BETTER:
+            change = -change
+        print(f"{name:>20}: {before:12.3f} -> {value:12.3f} ({change:+.1f}%)")
+        if change > threshold:
+            regressions.append(name)
+    for command, stats in current["latency"].items():
+        before = baseline.get("latency", {}).get(command, {}).get("p99_us")
+        if not before:
+            continue
+        change = 100 * (stats["p99_us"] - before) / before
+        print(f"{command + ' p99':>20}: {before:12.3f} -> "
+              f"{stats['p99_us']:12.3f} ({change:+.1f}%)")
+        if change > threshold:
+            regressions.append(f"{command} p99")
+    return regressions
+
+def main(arguments: list=None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.run")
+    parser.add_argument("--offerings", type=int, default=1000)
+    parser.add_argument("--registrations", type=int, default=100)
+    parser.add_argument("--cancel-ratio", type=float, default=0.1)
+    parser.add_argument("--invalid-ratio", type=float, default=0.01)
+    parser.add_argument("--allot-ratio", type=float, default=0.001)
+    parser.add_argument("--shared-employees", action="store_true",
+                        help="employees register for many offerings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="end-to-end runs, the fastest is kept")
+    parser.add_argument("--results", help="JSON file the results are saved to")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument("--threshold", type=float, default=5.0,
+                        help="percent change reported as a regression")
+    options = parser.parse_args(arguments)
+    params = {
+        "offerings": options.offerings,
+        "registrations": options.registrations,
+        "cancel_ratio": options.cancel_ratio,
+        "invalid_ratio": options.invalid_ratio,
+        "allot_ratio": options.allot_ratio,
+        "seed": options.seed,
+        "shared_employees": options.shared_employees,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "workload.txt")
+        lines = workload.write(path, **params)
+        results = {
+            "commit": _commit(),
+            "timestamp": datetime.datetime.now(
+                datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "workload": dict(params, lines=lines),
+            "end_to_end": end_to_end(path=path, lines=lines,
+                                     repeat=options.repeat),
+            "latency": latencies(path=path),
+        }
+    print(json.dumps(results, indent=2))
+    if options.results:
+        with open(options.results, "w") as file_handle:
+            json.dump(results, file_handle, indent=2)
+    if options.compare:
+        with open(options.compare) as file_handle:
+            baseline = json.load(file_handle)
+        regressions = compare(current=results, baseline=baseline,
+                              threshold=options.threshold)
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+from config import config
+from typing import Iterator
+import random
+
+# lines the app rejects with INPUT_DATA_ERROR
+_INVALID_LINES = (
+    "ADD-COURSE-OFFERING TITLE INSTRUCTOR 31022022 1 2",
+    "ADD-COURSE-OFFERING TITLE INSTRUCTOR 05062022 3 2",
+    "REGISTER EMP@EMAIL.COM",
+    "ALLOT",
+    "UNKNOWN-COMMAND ARGUMENT",
+    "",
+)
+
+
+def generate(offerings: int=100, registrations: int=100, seed: int=0,
+             cancel_ratio: float=0.0, invalid_ratio: float=0.0,
+             allot_ratio: float=0.0,
+             shared_employees: bool=False) -> Iterator[str]:
+    """Yields a synthetic command file, one line at a time
+
+    All offerings are added first. Registrations then arrive in random order
+    across the offerings, each offering receiving `registrations` of them,
+    and every offering is alloted at the end. Every generated command refers
+    to existing ids, so the file runs without errors.
+
+    Args:
+        offerings (int): number of course offerings added.
+        registrations (int): registrations per offering, which is also the
+            offering capacity.
+        seed (int): random seed, the same arguments yield the same commands.
+        cancel_ratio (float): chance that a registration is followed by a
+            CANCEL of a random existing registration.
+        invalid_ratio (float): chance that an invalid line is inserted
+            before a command.
+        allot_ratio (float): chance that a registration is followed by an
+            early ALLOT of a random offering.
+        shared_employees (bool): when set, the n-th registration of every
+            offering comes from the same n-th employee, so employees register
+            for many offerings. Otherwise every registration comes from a
+            different employee.
+
+    Returns:
+        iterator: command lines, newline terminated.
+    """
+    rand = random.Random(seed)
+    course_ids = []
+    for i in range(offerings):
+        title, instructor = f"TITLE{i}", f"INSTRUCTOR{i % 10}"
+        course_ids.append(f"OFFERING-{title}-{instructor}")
+        min_emp = rand.randint(1, max(registrations, 1))
+        yield (f"{config.ADD} {title} {instructor} 05062022"
+               f" {min_emp} {max(registrations, min_emp)}\n")
+    remaining = [registrations] * offerings
+    open_offerings = [i for i in range(offerings) if remaining[i]]
+    reg_ids = []
+    employee = 0
+    while open_offerings:
+        if rand.random() < invalid_ratio:
+            yield f"{rand.choice(_INVALID_LINES)}\n"
+        position = rand.randrange(len(open_offerings))
+        offering = open_offerings[position]
+        remaining[offering] -= 1
+        if not remaining[offering]:
+            open_offerings[position] = open_offerings[-1]
+            open_offerings.pop()
+        employee = registrations - remaining[offering] if shared_employees \
+            else employee + 1
+        yield (f"{config.REGISTER} EMP{employee}@EMAIL.COM"
+               f" {course_ids[offering]}\n")
+        reg_ids.append(f"REG-COURSE-EMP{employee}-TITLE{offering}")
+        if reg_ids and rand.random() < cancel_ratio:
+            position = rand.randrange(len(reg_ids))
+            yield f"{config.CANCEL} {reg_ids[position]}\n"
+            reg_ids[position] = reg_ids[-1]
+            reg_ids.pop()
+        if rand.random() < allot_ratio:
+            yield f"{config.ALLOT} {rand.choice(course_ids)}\n"
+    for course_id in course_ids:
+        yield f"{config.ALLOT} {course_id}\n"
+
+def write(path: str, **kwargs) -> int:
+    """Writes a generated command file, see `generate`
+
+    Returns:
+        int: number of lines written.
+    """
+    lines = 0
+    with open(path, "w") as file_handle:
+        for line in generate(**kwargs):
+            file_handle.write(line)
+            lines += 1
+    return lines
@@ -3,15 +3,59 @@ ADD = "ADD-COURSE-OFFERING"
 REGISTER = "REGISTER"
 ALLOT = "ALLOT"
 CANCEL = "CANCEL"
+ALLOT_ALL = "ALLOT-ALL"
+LIST_REGISTRATIONS = "LIST-REGISTRATIONS"
+LIST_BY_INSTRUCTOR = "LIST-OFFERINGS-BY-INSTRUCTOR"
+LIST_BY_DATE = "LIST-OFFERINGS-BY-DATE"
 
 # data types of arguments different commands support
 COMMANDS_METADATA = {
     ADD: (str, str, str, int, int),
     REGISTER: (str, str),
     ALLOT: (str,),
-    CANCEL: (str,)
+    CANCEL: (str,),
+    ALLOT_ALL: (),
+    LIST_REGISTRATIONS: (str,),
+    LIST_BY_INSTRUCTOR: (str,),
+    LIST_BY_DATE: (str,)
 }
 
+# journal: records per fsync, seconds before pending records are synced
+# anyway, and records per segment before it is compacted into a snapshot
+JOURNAL_BATCH_SIZE = 1024
+JOURNAL_SYNC_INTERVAL = 0.05
+JOURNAL_COMPACT_AFTER = 1000000
+
+# number of distinct offering dates kept by the date validation cache
+DATE_CACHE_SIZE = 4096
+# allotment export rows written per batch, and Parquet compression codec
+EXPORT_BATCH_SIZE = 65536
+EXPORT_COMPRESSION = "zstd"
+
+# first bytes of a compiled command file, and command words buffered while
+# compiling one
+COMPILED_MAGIC = b"GKCMDS01"
+COMPILED_CHUNK_WORDS = 65536
+
+# lines parsed by a worker at a time when parsing runs in worker processes,
+# and chunks queued per worker
+PIPELINE_CHUNK_LINES = 16384
+PIPELINE_CHUNKS_PER_WORKER = 2
+
+# suffix of the output file written for each input of a batch
+BATCH_OUTPUT_SUFFIX = ".out"
+
+# number of archived offerings kept in memory by the archive LRU cache
+ARCHIVE_CACHE_SIZE = 128
+# bits of the filter that spares database lookups of registration ids that
+# were never archived, a power of two
+ARCHIVE_FILTER_BITS = 2 ** 24
+
+# number of employee names kept by the cache registration ids are built from
+ID_CACHE_SIZE = 1024
+# number of raw argument values kept by the cache of interned values
+INTERN_CACHE_SIZE = 4096
+
 # commands and expected parameters
 SUPPORTED_COMMANDS = (
     "ADD-COURSE-OFFERING <course-name> <instructor>"
@@ -19,7 +63,32 @@ SUPPORTED_COMMANDS = (
     "REGISTER <email-id> <course-offering-id>\n"
     "ALLOT-COURSE <course-offering-id>\n"
     "CANCEL <course-registration-id>\n"
+    "ALLOT-ALL\n"
+    "LIST-REGISTRATIONS <email-id>\n"
+    "LIST-OFFERINGS-BY-INSTRUCTOR <instructor>\n"
+    "LIST-OFFERINGS-BY-DATE <date-in-ddmmyyyy>\n"
 )
 
 # arguments supported while starting the app from command line
 SUPPORTED_APP_ARGS = ("module name", "file path")
+
+# file path that makes the app read commands from stdin
+STDIN_PATH = "-"
+
+# file path that makes the app write its output to stdout
+STDOUT_PATH = "-"
+
+# async ingestion: commands queued before producers wait, and commands
+# applied per consumer wake-up
+INGEST_QUEUE_SIZE = 1024
+INGEST_BATCH_SIZE = 256
+
+# line that ends a command batch in `--serve -` mode
+END_OF_BATCH = "END-OF-BATCH"
+
+# output buffering: number of lines held before a write, and when to flush
+OUTPUT_BUFFER_SIZE = 8192
+FLUSH_AUTO = "auto"
+FLUSH_COMMAND = "command"
+FLUSH_END = "end"
+FLUSH_POLICIES = (FLUSH_AUTO, FLUSH_COMMAND, FLUSH_END)
@@ -1,29 +1,112 @@
-from src import register, add, cancel, allot
-from utils import utils
-from utils import exceptions
+from src.engine import Engine
 from config import config
+from utils import utils
+from utils import output
 import sys
 
+# modules behind optional features are imported where they are used, so a
+# plain run only pays for the ones it needs at startup
+
 def main():    
-    file_content = utils.parse_file(arguments=sys.argv)
-    operations = {
-        config.ADD: add.Add,
-        config.REGISTER: register.Register,
-        config.ALLOT: allot.Allot,
-        config.CANCEL: cancel.Cancel
-    }
-    courses, course_registrations = {}, {}
-    for line in file_content:
-        cmd_args = utils.detect_command(line)
+    options = utils.parse_args(arguments=sys.argv)
+    writer_options = {"buffer_size": options.buffer_size,
+                      "flush_policy": options.flush}
+    if options.serve:
+        from src import server
+        if options.serve == config.STDIN_PATH:
+            server.serve_stdio(**writer_options)
+        else:
+            server.serve_socket(path=options.serve, **writer_options)
+        return
+    if options.batch:
+        import os
+        import time
+        from src import batch
+        started = time.perf_counter()
+        results = batch.run(
+            paths=batch.expand(options.batch),
+            workers=options.workers if options.workers > 1 else
+            os.cpu_count() or 1,
+            output_dir=options.output_dir, shared_state=options.shared_state,
+            **writer_options)
+        with output.OutputWriter.open(options.output,
+                                      **writer_options) as writer:
+            writer.write(batch.summary(
+                results=results, seconds=time.perf_counter() - started))
+        return
+    if options.compile:
+        from src import compiled
+        compiled.compile_file(lines=utils.open_input(path=options.path),
+                              path=options.compile)
+        return
+    if utils.is_compiled(path=options.path):
+        from src import compiled
+        file_content = compiled.commands(
+            path=utils.validate_path(options.path))
+        execute = Engine.execute_parsed
+    else:
+        file_content = utils.open_input(path=options.path)
+        execute = Engine.execute_many
+    engine, lines_applied = Engine(), 0
+    if options.archive:
+        from src.archive import Archive
+        archive = Archive(path=options.archive)
+        engine = Engine(courses=archive.courses,
+                        course_reg=archive.course_reg)
+        engine.archive = archive
+    if options.snapshot:
+        import itertools
+        import os
+        from src import snapshot
+        if os.path.isfile(options.snapshot):
+            engine, lines_applied = snapshot.load(path=options.snapshot)
+            file_content = itertools.islice(file_content, lines_applied, None)
+    if options.journal:
+        from src import journal
+        engine = journal.recover(directory=options.journal,
+                                 waitlist=options.waitlist)
+        engine.journal = journal.Journal(directory=options.journal,
+                                         engine=engine)
+    if options.waitlist and engine.waitlists is None:
+        from src.waitlist import Waitlists
+        engine.waitlists = Waitlists()
+    if options.metrics:
+        import signal
+        from src.metrics import Metrics
+        engine.metrics = Metrics()
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: print(
+                engine.metrics.summary(), file=sys.stderr))
+    if options.export:
+        from src.export import AllotmentExport
+        engine.exporter = AllotmentExport(path=options.export)
+    if options.parse_workers > 1:
+        from src import pipeline
+        results = engine.execute_parsed(pipeline.commands(
+            lines=file_content, workers=options.parse_workers))
+    elif options.workers > 1:
+        from src import parallel
+        results = parallel.execute_many(lines=file_content,
+                                        workers=options.workers)
+    else:
+        results = execute(engine, file_content)
+    with output.OutputWriter.open(options.output, **writer_options) as writer:
         try:
-            command, params = utils.validate_command(cmd_args)
-        except exceptions.INPUT_DATA_ERROR:
-            print("INPUT_DATA_ERROR")
-            continue
-        object = operations[command](courses, course_registrations)
-        result = object.execute(*params)
-        utils.print_output(result=result)
-        courses, course_registrations = object.courses, object.course_reg
+            for result in results:
+                writer.write(result)
+                lines_applied += 1
+        finally:
+            if engine.journal is not None:
+                engine.journal.close()
+            if engine.exporter is not None:
+                engine.exporter.close()
+            if engine.archive is not None:
+                engine.archive.close()
+    if options.metrics:
+        print(engine.metrics.summary(), file=sys.stderr)
+    if options.snapshot:
+        snapshot.dump(engine=engine, path=options.snapshot,
+                      lines_applied=lines_applied)
 
 if __name__ == "__main__":
     main()
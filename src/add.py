@@ -1,32 +1,29 @@
-from src.constants import Constants
+from src import ids
+from src.records import Offering
 
 
 class Add:
-    def __init__(self, courses={}, course_reg={}):
+    def __init__(self, courses=None, course_reg=None, indexes=None):
         """Instantiates this class
 
         Args:
             courses (dict): available courses.
             course_reg (dict): employee course registrations.
+            indexes (Indexes): secondary indexes to keep up to date.
         """
-        self.courses = courses
-        self.course_reg = course_reg
+        self.courses = courses if courses is not None else {}
+        self.course_reg = course_reg if course_reg is not None else {}
+        self.indexes = indexes
 
     def __add_course(self, course_id: str, values: list) -> None:
-        self.courses[course_id] = {
-            Constants.title: values[0],
-            Constants.instructor: values[1],
-            Constants.min_emp: values[2],
-            Constants.max_emp: values[3],
-            Constants.slots_left: values[4],
-            Constants.date: values[5],
-            Constants.final_status: None,
-            Constants.alloted: False,
-            Constants.course_registered_ids: set()
-        }
-
-    def __set_id(self, values: list) -> str:
-        return Constants.ID_COURSE_OFFERING.format(*values)
+        course = Offering(*values)
+        if self.indexes is not None:
+            previous = self.courses.get(course_id)
+            if previous is not None:
+                self.indexes.remove_offering(course_id=course_id,
+                                             course=previous)
+            self.indexes.add_offering(course_id=course_id, course=course)
+        self.courses[course_id] = course
 
     def execute(self, title: str, instructor: str, date: str,
             min_emp: int, max_emp: int) -> None:
@@ -44,7 +41,7 @@ class Add:
         Returns:
             dict: updated courses.
         """
-        course_id = self.__set_id(values=[title, instructor])
+        course_id = ids.offering_id(title, instructor)
         slots_left = max_emp
         self.__add_course(
             course_id=course_id,
@@ -1,4 +1,7 @@
 from src.constants import Constants
+from src.records import Offering
+from collections.abc import Iterable, Iterator
+import itertools
 
 
 class Allot:
@@ -11,31 +14,67 @@ class Allot:
         """
         self.courses = courses
         self.course_reg = course_reg
+        # AllotmentExport receiving the rows of every allotment, Archive
+        # alloted courses are moved to, Indexes they are then removed from,
+        # and Waitlists whose queues are dropped once their course is
+        # alloted, when set
+        self.exporter = None
+        self.archive = None
+        self.indexes = None
+        self.waitlists = None
 
-    def __min_slots_filled(self, course: dict) -> bool:
-        if course.get(Constants.max_emp) - \
-            course.get(Constants.slots_left) < \
-                course.get(Constants.min_emp):
-                    return False
-        return True
-
-    def __format_allotments(self, course: dict, course_id: str) -> list:
-        result = []
-        registered_course_ids = sorted(course.get(
-            Constants.course_registered_ids))
-        for reg_id in registered_course_ids:
-            email = self.course_reg.get(reg_id).get(Constants.email_id)
-            result.append(f'{reg_id} {email} {course_id}'
-                  f' {course.get(Constants.title)}'
-                  f' {course.get(Constants.instructor)}'
-                  f' {course.get(Constants.date)}'
-                  f' {course.get(Constants.final_status)}')
-        return result
-
-    def get_course(self, course_id: str) -> dict:
+    def __min_slots_filled(self, course: Offering) -> bool:
+        return course.max_emp - course.slots_left >= course.min_emp
+
+    def __min_slots_filled_many(self, courses: list) -> list:
+        # the thresholds live on the records, copying them into NumPy arrays
+        # costs more than comparing them in place
+        return [course.max_emp - course.slots_left >= course.min_emp
+                for course in courses]
+
+    def __format_allotments(self, course: Offering,
+                            course_id: str) -> tuple:
+        course_reg = self.course_reg
+        suffix = (f' {course_id} {course.title} {course.instructor}'
+                  f' {course.date} {course.final_status}')
+        return tuple(
+            f'{reg_id} {course_reg[reg_id].email_id}{suffix}'
+            for reg_id in course.course_registered_ids
+        )
+
+    def get_course(self, course_id: str) -> Offering:
         return self.courses.get(course_id)
 
-    def execute(self, course_id: str) -> list:
+    def __finalize(self, course: Offering, course_id: str,
+                   filled: bool) -> tuple:
+        previous_status = course.final_status
+        course.final_status = Constants.FINAL_STATUS_CANCELED
+        if filled:
+            course.final_status = Constants.FINAL_STATUS_CONFIRMED
+            course.alloted = True
+            if self.waitlists is not None:
+                self.waitlists.drop(course_id=course_id)
+        self.courses[course_id] = course
+        if course.allotments is None or \
+                course.final_status != previous_status:
+            course.allotments = self.__format_allotments(
+                course=course, course_id=course_id)
+        if self.exporter is not None:
+            self.exporter.add(course_id=course_id, course=course,
+                              course_reg=self.course_reg)
+        allotments = course.allotments
+        if self.archive is not None and course.alloted:
+            if self.indexes is not None:
+                self.indexes.remove_offering(course_id=course_id,
+                                             course=course)
+                for reg_id in course.course_registered_ids:
+                    self.indexes.remove_registration(
+                        registration_id=reg_id,
+                        registration=self.course_reg[reg_id])
+            self.archive.evict(course_id=course_id)
+        return allotments
+
+    def execute(self, course_id: str) -> tuple:
         """Allot a course to all employees who registered for it
 
         Args:
@@ -43,13 +82,52 @@ class Allot:
                 wants to register.
 
         Returns:
-            dict: updated courses.
+            tuple: allotment lines, cached until the registrations or the
+                final status of the course change.
         """
         course = self.get_course(course_id=course_id)
-        course[Constants.final_status] = Constants.FINAL_STATUS_CANCELED
-        if self.__min_slots_filled(course=course):
-            course[Constants.final_status] = Constants.FINAL_STATUS_CONFIRMED
-            course[Constants.alloted] = True
-        self.courses[course_id] = course
-        result = self.__format_allotments(course=course, course_id=course_id)
-        return result
+        return self.__finalize(
+            course=course, course_id=course_id,
+            filled=self.__min_slots_filled(course=course))
+
+    def execute_many(self, course_ids: Iterable) -> Iterator:
+        """Allot several courses, checking all thresholds in one pass
+
+        Min/max thresholds are compared in a single pass.
+
+        Args:
+            course_ids (iterable): ids of the courses to allot.
+
+        Returns:
+            iterator: the same lines, in the same order, as allotting each
+                course with `execute`.
+        """
+        course_ids = list(course_ids)
+        courses = [self.get_course(course_id=course_id)
+                   for course_id in course_ids]
+        filled = self.__min_slots_filled_many(courses=courses)
+        rosters = [
+            self.__finalize(course=course, course_id=course_id,
+                            filled=is_filled) or ("",)
+            for course_id, course, is_filled in zip(course_ids, courses,
+                                                   filled)
+        ]
+        return itertools.chain.from_iterable(rosters)
+
+
+class AllotAll(Allot):
+    def pending(self) -> list:
+        return [course_id for course_id, course in self.courses.items()
+                if not course.alloted]
+
+    def execute(self) -> Iterator:
+        """Allot every course that has not been alloted yet
+
+        Returns:
+            iterator: allotment lines of all pending courses, in the order
+                the courses were added, or None if no course is pending.
+        """
+        course_ids = self.pending()
+        if not course_ids:
+            return None
+        return self.execute_many(course_ids=course_ids)
@@ -0,0 +1,277 @@
+from config import config
+from src.records import Offering, Registration, SortedIds
+import collections
+import sqlite3
+
+# an offering row holds its registration ids and their emails, joined by
+# newlines, and its position in the courses dict. Rows keep the position of
+# their record, and the lookups of the LIST commands are indexed.
+_SCHEMA = (
+    "DROP TABLE IF EXISTS offerings",
+    "DROP TABLE IF EXISTS registrations",
+    "CREATE TABLE offerings (course_id TEXT PRIMARY KEY, title TEXT,"
+    " instructor TEXT, min_emp INTEGER, max_emp INTEGER,"
+    " slots_left INTEGER, date TEXT, final_status TEXT, alloted INTEGER,"
+    " reg_ids TEXT, email_ids TEXT, position INTEGER) WITHOUT ROWID",
+    "CREATE TABLE registrations (reg_id TEXT PRIMARY KEY, course_id TEXT,"
+    " email_id TEXT, position INTEGER) WITHOUT ROWID",
+    "CREATE INDEX registrations_email ON registrations (email_id)",
+    "CREATE INDEX offerings_instructor ON offerings (instructor)",
+    "CREATE INDEX offerings_date ON offerings (date)",
+)
+
+
+class TieredDict(dict):
+    """Dict of hot records that falls back to an archive for missing keys
+
+    Lookups, `get` and `in` see archived records too, iteration and `len`
+    only see the hot ones. Every key keeps the position it was first
+    inserted at, even across archiving, and iteration follows it, so a key
+    stored again after it was archived comes back where a plain dict would
+    have kept it.
+    """
+
+    def __init__(self, lookup, archived_position=None):
+        super().__init__()
+        self.lookup = lookup
+        # key -> archived position, or None, for keys inserted again
+        self.archived_position = archived_position
+        # key -> position of the hot records
+        self.positions = {}
+        self.next_position = 0
+        # whether the dict order no longer follows the positions
+        self.reordered = False
+
+    def __setitem__(self, key, value) -> None:
+        if key not in self.positions:
+            position = None
+            if self.archived_position is not None:
+                position = self.archived_position(key)
+            if position is None:
+                position = self.next_position
+                self.next_position += 1
+            else:
+                self.reordered = True
+            self.positions[key] = position
+        dict.__setitem__(self, key, value)
+
+    def pop(self, key, *default):
+        self.positions.pop(key, None)
+        return dict.pop(self, key, *default)
+
+    def __iter__(self):
+        if not self.reordered:
+            return dict.__iter__(self)
+        return iter(sorted(dict.keys(self), key=self.positions.__getitem__))
+
+    def keys(self):
+        return list(self) if self.reordered else dict.keys(self)
+
+    def values(self):
+        if not self.reordered:
+            return dict.values(self)
+        return [dict.__getitem__(self, key) for key in self]
+
+    def items(self):
+        if not self.reordered:
+            return dict.items(self)
+        return [(key, dict.__getitem__(self, key)) for key in self]
+
+    def __missing__(self, key):
+        value = self.lookup(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = dict.get(self, key)
+        if value is None:
+            value = self.lookup(key)
+        return default if value is None else value
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or self.lookup(key) is not None
+
+
+class _Filter:
+    """Bitset of hashed keys, tells which keys are certainly not archived"""
+
+    def __init__(self, bits: int=config.ARCHIVE_FILTER_BITS):
+        self.bits = bytearray(bits // 8)
+        self.mask = bits - 1
+
+    def add(self, key: str) -> None:
+        position = hash(key) & self.mask
+        self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        position = hash(key) & self.mask
+        return bool(self.bits[position >> 3] & (1 << (position & 7)))
+
+
+class Archive:
+    def __init__(self, path: str, cache_size: int=config.ARCHIVE_CACHE_SIZE):
+        """Instantiates this class
+
+        Alloted offerings only ever answer CANCEL_REJECTED, so they and their
+        registrations are moved out of memory into a sqlite database. The
+        most recently archived or read ones are kept in a small LRU cache.
+        `courses` and `course_reg` are the state dicts of an engine using
+        the archive, they answer for archived records transparently.
+
+        Args:
+            path (str): database file path, recreated empty.
+            cache_size (int): number of archived offerings kept in memory,
+                with their registrations.
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA synchronous = OFF")
+        for statement in _SCHEMA:
+            self.connection.execute(statement)
+        self.cache_size = cache_size
+        # course id -> offering, and registration id -> registration of the
+        # cached offerings
+        self.cache = collections.OrderedDict()
+        self.cached_registrations = {}
+        # ids outside the filter skip the database lookup
+        self.filter = _Filter()
+        self.courses = TieredDict(self.offering, self.position)
+        self.course_reg = TieredDict(self.registration)
+        self.archived = 0
+
+    def __cache(self, course_id: str, course: Offering,
+                registrations: dict) -> None:
+        previous = self.cache.pop(course_id, None)
+        if previous is not None:
+            self.__uncache_registrations(previous)
+        self.cache[course_id] = course
+        self.cached_registrations.update(registrations)
+        if len(self.cache) > self.cache_size:
+            _, oldest = self.cache.popitem(last=False)
+            self.__uncache_registrations(oldest)
+
+    def __uncache_registrations(self, course: Offering) -> None:
+        for reg_id in course.course_registered_ids:
+            self.cached_registrations.pop(reg_id, None)
+
+    def evict(self, course_id: str) -> None:
+        """Moves an alloted offering and its registrations to the archive
+
+        Args:
+            course_id (str): id of the offering.
+        """
+        course = self.courses[course_id]
+        # registrations already archived with an earlier eviction keep
+        # their row
+        positions = self.course_reg.positions
+        hot = [(positions[reg_id], reg_id) for reg_id
+               in course.course_registered_ids if reg_id in positions]
+        registrations = {reg_id: self.course_reg.pop(reg_id, None) or
+                         self.course_reg[reg_id]
+                         for reg_id in course.course_registered_ids}
+        self.connection.execute(
+            "INSERT OR REPLACE INTO offerings VALUES (?, ?, ?, ?, ?, ?, ?, ?,"
+            " ?, ?, ?, ?)",
+            (course_id, course.title, course.instructor, course.min_emp,
+             course.max_emp, course.slots_left, course.date,
+             course.final_status, course.alloted, "\n".join(registrations),
+             "\n".join(registration.email_id
+                       for registration in registrations.values()),
+             self.courses.positions[course_id]))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO registrations VALUES (?, ?, ?, ?)",
+            [(reg_id, course_id, registrations[reg_id].email_id, position)
+             for position, reg_id in hot])
+        self.filter.add(course_id)
+        for reg_id in registrations:
+            self.filter.add(reg_id)
+        self.courses.pop(course_id, None)
+        self.__cache(course_id, course, registrations)
+        self.archived += 1
+
+    def offering(self, course_id: str) -> Offering:
+        """Reads an archived offering, None if it is not archived"""
+        course = self.cache.get(course_id)
+        if course is not None:
+            self.cache.move_to_end(course_id)
+            return course
+        if course_id not in self.filter:
+            return None
+        row = self.connection.execute(
+            "SELECT title, instructor, min_emp, max_emp, slots_left, date,"
+            " final_status, alloted, reg_ids, email_ids FROM offerings"
+            " WHERE course_id = ?", (course_id,)).fetchone()
+        if row is None:
+            return None
+        (title, instructor, min_emp, max_emp, slots_left, date, final_status,
+         alloted, reg_ids, email_ids) = row
+        reg_ids = reg_ids.split("\n") if reg_ids else []
+        registrations = {
+            reg_id: Registration(course_id, email_id)
+            for reg_id, email_id in zip(reg_ids, email_ids.split("\n"))}
+        course = Offering(
+            title, instructor, min_emp, max_emp, slots_left, date,
+            final_status=final_status, alloted=bool(alloted),
+            course_registered_ids=SortedIds(reg_ids))
+        self.__cache(course_id, course, registrations)
+        return course
+
+    def position(self, course_id: str) -> int:
+        """Position of an archived offering, None if it is not archived"""
+        if course_id not in self.filter:
+            return None
+        row = self.connection.execute(
+            "SELECT position FROM offerings WHERE course_id = ?",
+            (course_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def registrations_by_email(self, email_id: str) -> list:
+        """Archived registrations of an employee
+
+        Returns:
+            list: (position, registration id, course id) of each one.
+        """
+        return self.connection.execute(
+            "SELECT position, reg_id, course_id FROM registrations"
+            " WHERE email_id = ?", (email_id,)).fetchall()
+
+    def offerings_by_instructor(self, instructor: str) -> list:
+        """Archived offerings of an instructor, see `offerings_by_date`"""
+        return self.__offerings("instructor", instructor)
+
+    def offerings_by_date(self, date: str) -> list:
+        """Archived offerings on a date
+
+        Offerings stored again since they were archived are left out when
+        their date no longer matches. The others may also be in the
+        indexes, which then answer for them.
+
+        Returns:
+            list: (position, course id, title, instructor, date) of each one.
+        """
+        return self.__offerings("date", date)
+
+    def __offerings(self, column: str, value: str) -> list:
+        rows = self.connection.execute(
+            f"SELECT position, course_id, title, instructor, date"
+            f" FROM offerings WHERE {column} = ?", (value,)).fetchall()
+        result = []
+        for row in rows:
+            course = dict.get(self.courses, row[1])
+            if course is None or getattr(course, column) == value:
+                result.append(row)
+        return result
+
+    def registration(self, reg_id: str) -> Registration:
+        """Reads an archived registration, None if it is not archived"""
+        registration = self.cached_registrations.get(reg_id)
+        if registration is not None or reg_id not in self.filter:
+            return registration
+        row = self.connection.execute(
+            "SELECT course_id, email_id FROM registrations WHERE reg_id = ?",
+            (reg_id,)).fetchone()
+        return Registration(*row) if row is not None else None
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,147 @@
+from src.constants import Constants
+from src.engine import Engine
+from config import config
+from utils import exceptions
+from utils import output
+from utils import utils
+import glob
+import os
+import time
+
+
+def expand(patterns: list) -> list:
+    """Expands input file paths and glob patterns
+
+    Args:
+        patterns (list): file paths or glob patterns.
+
+    Returns:
+        list: matching file paths, in the order of the patterns and sorted
+            within a pattern, without duplicates. Patterns match from the
+            current directory, so their matches are made absolute, plain
+            paths are left for `utils.validate_path` like a single input.
+    """
+    paths = []
+    for pattern in patterns:
+        matches = [os.path.abspath(path)
+                   for path in sorted(glob.glob(pattern))] \
+            if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise exceptions.INPUT_DATA_ERROR(
+                message=f"no input file matches {pattern}")
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+def output_path(path: str, output_dir: str=None) -> str:
+    """Path of the output written for an input file
+
+    Args:
+        path (str): input file path.
+        output_dir (str): directory of the outputs, next to the inputs if
+            empty.
+
+    Returns:
+        str: the input path, in the output directory if any, with the
+            `config.BATCH_OUTPUT_SUFFIX` suffix.
+    """
+    if output_dir:
+        path = os.path.join(output_dir, os.path.basename(path))
+    return f"{path}{config.BATCH_OUTPUT_SUFFIX}"
+
+def _commands(engine: Engine, path: str):
+    if utils.is_compiled(path=path):
+        from src import compiled
+        return engine.execute_parsed(
+            compiled.commands(path=utils.validate_path(path)))
+    return engine.execute_many(utils.open_input(path=path))
+
+def run_file(engine: Engine, path: str, output_path: str,
+             **writer_options) -> tuple:
+    """Runs one input file and writes its output
+
+    Args:
+        engine (Engine): engine the commands are run on.
+        path (str): input file path, text or compiled.
+        output_path (str): output file path.
+        writer_options: `OutputWriter` options.
+
+    Returns:
+        tuple: input path, output path, number of commands, number of
+            invalid lines and seconds taken.
+    """
+    started = time.perf_counter()
+    commands = errors = 0
+    with output.OutputWriter.open(output_path, **writer_options) as writer:
+        for result in _commands(engine=engine, path=path):
+            writer.write(result)
+            commands += 1
+            errors += result is Constants.INPUT_DATA_ERROR
+    return (path, output_path, commands, errors,
+            time.perf_counter() - started)
+
+def _run_job(job: tuple) -> tuple:
+    path, output_path, writer_options = job
+    return run_file(Engine(), path, output_path, **writer_options)
+
+def run(paths: list, workers: int, output_dir: str=None,
+        shared_state: bool=False, **writer_options) -> list:
+    """Runs several input files, each to its own output file
+
+    Files run concurrently in a pool of processes, each on a fresh state,
+    the largest ones first so the whole set takes about as long as the
+    largest file. With a shared state, they run one after the other, in
+    order, on a single engine instead.
+
+    Args:
+        paths (list): input file paths.
+        workers (int): number of worker processes.
+        output_dir (str): directory of the outputs, see `output_path`.
+        shared_state (bool): run every file on the same engine.
+        writer_options: `OutputWriter` options.
+
+    Returns:
+        list: `run_file` results, in the order of `paths`.
+    """
+    # plain paths are resolved like inputs are, from the repository
+    outputs = [output_path(utils.validate_path(path), output_dir)
+               for path in paths]
+    if len(set(outputs)) != len(outputs):
+        raise exceptions.INPUT_DATA_ERROR(
+            message="several input files have the same output file")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if shared_state or workers < 2 or len(paths) < 2:
+        engine = Engine()
+        return [run_file(engine if shared_state else Engine(), path,
+                         output, **writer_options)
+                for path, output in zip(paths, outputs)]
+    jobs = sorted(zip(paths, outputs),
+                  key=lambda job: os.path.getsize(utils.validate_path(job[0])),
+                  reverse=True)
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(
+            min(workers, len(paths))) as pool:
+        results = {result[0]: result for result in pool.map(
+            _run_job, [(path, output, writer_options)
+                       for path, output in jobs])}
+    return [results[path] for path in paths]
+
+def summary(results: list, seconds: float) -> list:
+    """Formats batch results as a table, one row per file and a total
+
+    Args:
+        results (list): `run_file` results.
+        seconds (float): wall time of the whole batch.
+
+    Returns:
+        list: summary lines.
+    """
+    rows = [f"{'file':<40} {'commands':>10} {'errors':>8} {'seconds':>9}"
+            f"  output"]
+    for path, output_path, commands, errors, file_seconds in results:
+        rows.append(f"{path:<40} {commands:>10} {errors:>8}"
+                    f" {file_seconds:>9.3f}  {output_path}")
+    rows.append(f"{'total':<40} {sum(result[2] for result in results):>10}"
+                f" {sum(result[3] for result in results):>8}"
+                f" {seconds:>9.3f}")
+    return rows
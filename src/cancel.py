@@ -1,24 +1,35 @@
 from src.constants import Constants
+from src.records import Offering
+from src.register import Register
 
 class Cancel:
-    def __init__(self, courses, course_reg):
+    def __init__(self, courses, course_reg, indexes=None):
         """Instantiates this class
 
         Args:
             courses (dict): available courses.
             course_reg (dict): employee course registrations.
+            indexes (Indexes): secondary indexes to keep up to date.
         """
         self.courses = courses
         self.course_reg = course_reg
+        self.indexes = indexes
+        # Waitlists promoted from when a slot is freed, when set
+        self.waitlists = None
+        self.register = Register(courses, course_reg, indexes)
 
-    def update(self, course: dict, course_id: str,
+    def update(self, course: Offering, course_id: str,
                              registration_id: str):
-        course.get(Constants.course_registered_ids).remove(registration_id)
-        course[Constants.slots_left] += 1
-        self.course_reg.pop(registration_id)
+        course.course_registered_ids.remove(registration_id)
+        course.slots_left += 1
+        course.allotments = None
+        registration = self.course_reg.pop(registration_id)
+        if self.indexes is not None:
+            self.indexes.remove_registration(
+                registration_id=registration_id, registration=registration)
         self.courses[course_id] = course
 
-    def get_course(self, course_id: str) -> dict:
+    def get_course(self, course_id: str) -> Offering:
         return self.courses.get(course_id)
 
     def execute(self, course_reg_id: str) -> None:
@@ -28,15 +39,30 @@ class Cancel:
             course_reg_id (str): registered course id.
 
         Returns:
-            tuple: updated courses and employee registrations.
+            str | tuple: cancel status. With waitlists, a waitlisted
+                registration is taken off its waitlist, and when a slot is
+                freed the first waiter is registered and its acceptance
+                follows the cancel status. Waiters dropped when their course
+                was alloted are rejected.
         """
-        course_id = self.course_reg.get(course_reg_id).get(
-            Constants.course_id
-        )
+        waitlists = self.waitlists
+        registration = self.course_reg.get(course_reg_id)
+        if waitlists is not None and registration is None:
+            if waitlists.remove(course_reg_id):
+                return f'{course_reg_id} {Constants.CANCEL_ACCEPTED}'
+            return f'{course_reg_id} {Constants.CANCEL_REJECTED}'
+        course_id = registration.course_id
         course = self.get_course(course_id=course_id)
-        if not course.get(Constants.alloted):
+        if not course.alloted:
             self.update(course=course,
                           course_id=course_id,
                           registration_id=course_reg_id)
-            return f'{course_reg_id} {Constants.CANCEL_ACCEPTED}'
+            accepted = f'{course_reg_id} {Constants.CANCEL_ACCEPTED}'
+            waiter = waitlists.pop(course_id) if waitlists is not None \
+                else None
+            if waiter is None:
+                return accepted
+            _, email_id = waiter
+            return accepted, self.register.execute(email_id=email_id,
+                                                   course_id=course_id)
         return f'{course_reg_id} {Constants.CANCEL_REJECTED}'
@@ -0,0 +1,189 @@
+from config import config
+from utils import utils
+from collections.abc import Iterable, Iterator
+import array
+import itertools
+import mmap
+import os
+import struct
+import sys
+
+# A compiled command file holds a header, the commands as 32-bit words and a
+# table of the distinct argument values. Each command is an opcode word
+# followed by one word per argument, the index of its value in the table.
+# Opcode 0 marks a line that failed validation, the others are the commands
+# of config.COMMANDS_METADATA, in order. The table is the values joined by
+# newlines, which never occur inside an argument, followed by the indexes of
+# the integer values. Words and indexes are little-endian.
+
+# magic, number of commands, of command words, of values, length of the
+# joined values and number of integer values
+_HEADER = struct.Struct("<8sQQQQQ")
+_MAGIC = config.COMPILED_MAGIC
+_INVALID = 0
+_COMMANDS = (None,) + tuple(config.COMMANDS_METADATA)
+_OPCODES = {command: opcode for opcode, command in enumerate(_COMMANDS)
+            if command is not None}
+_ARITIES = (0,) + tuple(len(types)
+                        for types in config.COMMANDS_METADATA.values())
+_SWAP = sys.byteorder != "little"
+
+
+class _ValueTable:
+    def __init__(self):
+        self.indexes = {}
+        self.integers = array.array("I")
+
+    def __call__(self, value) -> int:
+        # 1 and "1" are different values
+        key = (type(value), value)
+        index = self.indexes.get(key)
+        if index is None:
+            index = self.indexes[key] = len(self.indexes)
+            if type(value) is int:
+                self.integers.append(index)
+        return index
+
+
+def _write_array(file_handle, values: array.array) -> None:
+    if _SWAP:
+        values.byteswap()
+    values.tofile(file_handle)
+
+def _read_array(data) -> array.array:
+    values = array.array("I")
+    values.frombytes(data)
+    if _SWAP:
+        values.byteswap()
+    return values
+
+def _encode(line: str, words: array.array, values: _ValueTable) -> None:
+    parsed = utils.parse_line(line)
+    if parsed is None:
+        words.append(_INVALID)
+        return
+    command, params = parsed
+    words.append(_OPCODES[command])
+    words.extend(map(values, params))
+
+def encode(lines: Iterable) -> tuple:
+    """Validates command lines and encodes them in memory
+
+    Args:
+        lines (iterable): raw command lines.
+
+    Returns:
+        tuple: bytes of the command words and list of the argument values,
+            see `decode`.
+    """
+    values = _ValueTable()
+    words = array.array("I")
+    for line in lines:
+        _encode(line, words, values)
+    return words.tobytes(), [value for _, value in values.indexes]
+
+def decode(words: bytes, values: list) -> Iterator:
+    """Reads commands encoded by `encode`
+
+    Args:
+        words (bytes): bytes of the command words, in native byte order.
+        values (list): argument values, strings are interned again.
+
+    Returns:
+        iterator: command name and arguments of each command, or None for
+            lines that failed validation, see `utils.parse_line`.
+    """
+    values = [sys.intern(value) if type(value) is str else value
+              for value in values]
+    decoded = array.array("I")
+    decoded.frombytes(words)
+    return _decode(iter(decoded), values)
+
+def compile_file(lines: Iterable, path: str) -> int:
+    """Validates command lines once and writes them in compiled form
+
+    The file is written next to `path` and moved in place.
+
+    Args:
+        lines (iterable): raw command lines.
+        path (str): compiled file path.
+
+    Returns:
+        int: number of commands written, invalid lines included.
+    """
+    values = _ValueTable()
+    commands = num_words = 0
+    words = array.array("I")
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file_handle:
+        file_handle.write(bytes(_HEADER.size))
+        for line in lines:
+            _encode(line, words, values)
+            commands += 1
+            if len(words) >= config.COMPILED_CHUNK_WORDS:
+                num_words += len(words)
+                _write_array(file_handle, words)
+                words = array.array("I")
+        num_words += len(words)
+        _write_array(file_handle, words)
+        joined = "\n".join(str(value) for _, value in values.indexes).encode()
+        file_handle.write(joined)
+        _write_array(file_handle, values.integers)
+        file_handle.seek(0)
+        file_handle.write(_HEADER.pack(
+            _MAGIC, commands, num_words, len(values.indexes), len(joined),
+            len(values.integers)))
+        file_handle.flush()
+        os.fsync(file_handle.fileno())
+    os.replace(temp_path, path)
+    return commands
+
+def commands(path: str) -> Iterator:
+    """Reads a compiled command file
+
+    The file is memory-mapped and its words are decoded a chunk at a time.
+    Arguments are looked up in the value table, lines are neither tokenized
+    nor validated again.
+
+    Args:
+        path (str): compiled file path.
+
+    Returns:
+        iterator: command name and arguments of each command, or None for
+            lines that failed validation, see `utils.parse_line`.
+    """
+    with open(path, "rb") as file_handle, \
+            mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, _, num_words, num_values, joined_size, num_integers = \
+            _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a compiled command file")
+        words_end = _HEADER.size + num_words * 4
+        values = []
+        if num_values:
+            values = [sys.intern(value) for value in
+                      data[words_end:words_end + joined_size].decode()
+                      .split("\n")]
+        offset = words_end + joined_size
+        for index in _read_array(data[offset:offset + num_integers * 4]):
+            values[index] = int(values[index])
+        chunk = config.COMPILED_CHUNK_WORDS * 4
+        words = itertools.chain.from_iterable(
+            _read_array(data[start:min(start + chunk, words_end)])
+            for start in range(_HEADER.size, words_end, chunk))
+        yield from _decode(words, values)
+
+def _decode(words: Iterator, values: list) -> Iterator:
+    names, arities = _COMMANDS, _ARITIES
+    for opcode in words:
+        if opcode == _INVALID:
+            yield None
+            continue
+        arity = arities[opcode]
+        if arity == 1:
+            params = [values[next(words)]]
+        elif arity == 2:
+            params = [values[next(words)], values[next(words)]]
+        else:
+            params = [values[next(words)] for _ in range(arity)]
+        yield names[opcode], params
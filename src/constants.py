@@ -1,12 +1,11 @@
-from dataclasses import dataclass
-
-@dataclass
 class Constants:
     ID_COURSE_OFFERING = "OFFERING-{}-{}"
     ID_COURSE_REGISTRATION = "REG-COURSE-{}-{}"
 
     STATUS_ACCEPTED = "ACCEPTED"
     STATUS_COURSE_FULL = "COURSE_FULL_ERROR"
+    STATUS_DUPLICATE = "DUPLICATE_REGISTRATION_ERROR"
+    STATUS_WAITLISTED = "WAITLISTED"
 
     FINAL_STATUS_CONFIRMED = "CONFIRMED"
     FINAL_STATUS_CANCELED = "COURSE_CANCELED"
@@ -14,6 +13,9 @@ class Constants:
     CANCEL_ACCEPTED = "CANCEL_ACCEPTED"
     CANCEL_REJECTED = "CANCEL_REJECTED"
 
+    INPUT_DATA_ERROR = "INPUT_DATA_ERROR"
+    BATCH_ERROR = "BATCH_ERROR"
+
     title = "title"
     instructor = "instructor"
     min_emp = "min_emp"
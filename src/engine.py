@@ -0,0 +1,207 @@
+from src import register, add, cancel, allot, query
+from src.indexes import Indexes
+from src.constants import Constants
+from config import config
+from utils import utils
+from collections.abc import Iterable, Iterator
+
+
+def _parsed(command):
+    return command
+
+
+class Engine:
+    def __init__(self, courses: dict=None, course_reg: dict=None,
+                 journal=None, metrics=None):
+        """Instantiates this class
+
+        The engine owns the app state and one long-lived handler per
+        command, so commands can be executed in-process without going
+        through the command line.
+
+        Args:
+            courses (dict): available courses.
+            course_reg (dict): employee course registrations.
+            journal (Journal): journal recording accepted state changes.
+            metrics (Metrics): per command metrics, collected by
+                `execute_many` when set.
+        """
+        self.journal = journal
+        self.metrics = metrics
+        self.courses = courses if courses is not None else {}
+        self.course_reg = course_reg if course_reg is not None else {}
+        # secondary indexes, built on the first LIST-* command
+        self.indexes = None
+        state = (self.courses, self.course_reg)
+        self.handlers = {
+            config.ADD: add.Add(*state),
+            config.REGISTER: register.Register(*state),
+            config.ALLOT: allot.Allot(*state),
+            config.CANCEL: cancel.Cancel(*state),
+            config.ALLOT_ALL: allot.AllotAll(*state),
+            config.LIST_REGISTRATIONS: query.ListRegistrations(
+                *state, self.build_indexes),
+            config.LIST_BY_INSTRUCTOR: query.ListOfferingsByInstructor(
+                *state, self.build_indexes),
+            config.LIST_BY_DATE: query.ListOfferingsByDate(
+                *state, self.build_indexes)
+        }
+
+    def build_indexes(self) -> Indexes:
+        """Builds the secondary indexes LIST-* commands are answered from
+
+        They are built from the current state the first time they are
+        needed and kept up to date by the handlers from then on, so runs
+        without queries never pay for them.
+
+        Returns:
+            Indexes: the engine indexes.
+        """
+        if self.indexes is None:
+            # with an archive, only hot records are indexed, positioned like
+            # the archived ones
+            positions = self.courses.positions \
+                if self.archive is not None else None
+            self.indexes = Indexes.build(self.courses, self.course_reg,
+                                         positions=positions)
+            for handler in self.handlers.values():
+                if hasattr(handler, "indexes"):
+                    handler.indexes = self.indexes
+            self.handlers[config.CANCEL].register.indexes = self.indexes
+        return self.indexes
+
+    @property
+    def exporter(self):
+        """AllotmentExport receiving the rows of every allotment, or None"""
+        return self.handlers[config.ALLOT].exporter
+
+    @exporter.setter
+    def exporter(self, exporter) -> None:
+        self.handlers[config.ALLOT].exporter = exporter
+        self.handlers[config.ALLOT_ALL].exporter = exporter
+
+    @property
+    def archive(self):
+        """Archive alloted courses are moved to, or None"""
+        return self.handlers[config.ALLOT].archive
+
+    @archive.setter
+    def archive(self, archive) -> None:
+        self.handlers[config.ALLOT].archive = archive
+        self.handlers[config.ALLOT_ALL].archive = archive
+        self.handlers[config.LIST_REGISTRATIONS].archive = archive
+        self.handlers[config.LIST_BY_INSTRUCTOR].archive = archive
+        self.handlers[config.LIST_BY_DATE].archive = archive
+
+    @property
+    def waitlists(self):
+        """Waitlists full courses queue registrations on, or None"""
+        return self.handlers[config.REGISTER].waitlists
+
+    @waitlists.setter
+    def waitlists(self, waitlists) -> None:
+        self.handlers[config.REGISTER].waitlists = waitlists
+        self.handlers[config.CANCEL].waitlists = waitlists
+        self.handlers[config.ALLOT].waitlists = waitlists
+        self.handlers[config.ALLOT_ALL].waitlists = waitlists
+
+    def dispatch(self, command: str, params: list):
+        """Runs an already validated command, without journaling it
+
+        Args:
+            command (str): command name.
+            params (list): converted command arguments.
+
+        Returns:
+            str | tuple: command output.
+        """
+        return self.handlers[command].execute(*params)
+
+    def allot_all(self):
+        """Allots every pending course, like the ALLOT-ALL command"""
+        result = self.handlers[config.ALLOT_ALL].execute()
+        if self.journal is not None:
+            self.journal.record(config.ALLOT_ALL, [], result)
+        return result
+
+    def execute(self, line: str):
+        """Parses, validates and runs one input line
+
+        Args:
+            line (str): raw command line.
+
+        Returns:
+            str | tuple: command output, `INPUT_DATA_ERROR` for invalid
+                lines. ALLOT outputs one line per registration.
+        """
+        parsed = utils.parse_line(line)
+        if parsed is None:
+            return Constants.INPUT_DATA_ERROR
+        command, params = parsed
+        result = self.handlers[command].execute(*params)
+        if self.journal is not None:
+            self.journal.record(command, params, result)
+        return result
+
+    def execute_many(self, lines: Iterable) -> Iterator:
+        """Runs input lines in order, yielding the output of each
+
+        Args:
+            lines (iterable): raw command lines.
+
+        Returns:
+            iterator: command outputs, see `execute`.
+        """
+        if self.journal is not None or self.metrics is not None:
+            return self.__execute_many_hooked(lines, utils.parse_line)
+        return self.__execute_many(lines, utils.parse_line)
+
+    def execute_parsed(self, commands: Iterable) -> Iterator:
+        """Runs already parsed commands in order, like `execute_many`
+
+        Args:
+            commands (iterable): command name and converted arguments of
+                each line, or None for invalid lines, see `utils.parse_line`.
+
+        Returns:
+            iterator: command outputs, see `execute`.
+        """
+        if self.journal is not None or self.metrics is not None:
+            return self.__execute_many_hooked(commands, _parsed)
+        return self.__execute_many(commands, _parsed)
+
+    def __execute_many(self, lines: Iterable, parse_line) -> Iterator:
+        handlers = self.handlers
+        for line in lines:
+            parsed = parse_line(line)
+            if parsed is None:
+                yield Constants.INPUT_DATA_ERROR
+                continue
+            yield handlers[parsed[0]].execute(*parsed[1])
+
+    def __execute_many_hooked(self, lines: Iterable, parse_line) -> Iterator:
+        handlers = self.handlers
+        record = self.journal.record if self.journal is not None else None
+        metrics = self.metrics
+        clock = metrics.clock if metrics is not None else None
+        for line in lines:
+            if metrics is not None:
+                started = clock()
+                parsed = parse_line(line)
+                validated = clock()
+            else:
+                parsed = parse_line(line)
+            if parsed is None:
+                if metrics is not None:
+                    metrics.record(Constants.INPUT_DATA_ERROR,
+                                   validated - started, 0)
+                yield Constants.INPUT_DATA_ERROR
+                continue
+            command, params = parsed
+            result = handlers[command].execute(*params)
+            if metrics is not None:
+                metrics.record(command, validated - started,
+                               clock() - validated)
+            if record is not None:
+                record(command, params, result)
+            yield result
@@ -0,0 +1,177 @@
+from config import config
+from src.records import Offering
+from utils import exceptions
+import zipfile
+
+# exported columns, one row per alloted registration
+COLUMNS = ("reg_id", "email_id", "course_id", "title", "instructor", "date",
+           "final_status")
+# columns holding a value per registration, the other ones hold the same
+# value for every registration of an offering and are dictionary encoded
+_ROW_COLUMNS = COLUMNS[:2]
+_OFFERING_COLUMNS = COLUMNS[2:]
+_CODES = "offering"
+_PARQUET_MAGIC = b"PAR1"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+def _numpy():
+    try:
+        import numpy
+        import numpy.lib.format
+    except ImportError:
+        return None
+    return numpy
+
+
+class _ParquetWriter:
+    def __init__(self, pyarrow, path: str):
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema(
+            [(name, pyarrow.string()) for name in _ROW_COLUMNS] +
+            [(name, pyarrow.dictionary(pyarrow.int32(), pyarrow.string()))
+             for name in _OFFERING_COLUMNS])
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression=config.EXPORT_COMPRESSION)
+
+    def write(self, rows: dict, codes: list, offerings: list) -> None:
+        pyarrow = self.pyarrow
+        codes = pyarrow.array(codes, pyarrow.int32())
+        columns = [pyarrow.array(rows[name], pyarrow.string())
+                   for name in _ROW_COLUMNS]
+        columns += [pyarrow.DictionaryArray.from_arrays(
+                        codes, pyarrow.array(values, pyarrow.string()))
+                    for values in zip(*offerings)]
+        self.writer.write_table(
+            pyarrow.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _NumpyWriter:
+    def __init__(self, numpy, path: str):
+        self.numpy = numpy
+        self.archive = zipfile.ZipFile(path, "w",
+                                       compression=zipfile.ZIP_DEFLATED,
+                                       compresslevel=1)
+        self.batches = 0
+
+    def __write_array(self, name: str, values: list, dtype) -> None:
+        with self.archive.open(f"{name}-{self.batches:08d}.npy",
+                               "w") as file_handle:
+            self.numpy.lib.format.write_array(
+                file_handle, self.numpy.array(values, dtype=dtype),
+                allow_pickle=False)
+
+    def write(self, rows: dict, codes: list, offerings: list) -> None:
+        for name in _ROW_COLUMNS:
+            self.__write_array(name, rows[name], str)
+        self.__write_array(_CODES, codes, self.numpy.int32)
+        for name, values in zip(_OFFERING_COLUMNS, zip(*offerings)):
+            self.__write_array(name, values, str)
+        self.batches += 1
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class AllotmentExport:
+    def __init__(self, path: str, batch_size: int=config.EXPORT_BATCH_SIZE):
+        """Instantiates this class
+
+        Allotments are written column by column, in batches of rows, to a
+        compressed Parquet file when pyarrow is installed, and otherwise to
+        a NumPy `.npz` archive holding arrays per column and batch. Offering
+        columns are dictionary encoded, a batch stores each offering once.
+
+        Args:
+            path (str): export file path.
+            batch_size (int): number of rows buffered before a batch is
+                written.
+        """
+        pyarrow = _pyarrow()
+        if pyarrow is not None:
+            self.writer = _ParquetWriter(pyarrow, path)
+        else:
+            numpy = _numpy()
+            if numpy is None:
+                raise exceptions.INPUT_DATA_ERROR(
+                    message="exporting allotments needs pyarrow or numpy")
+            self.writer = _NumpyWriter(numpy, path)
+        self.batch_size = batch_size
+        self.__reset()
+
+    def __reset(self) -> None:
+        self.rows = {name: [] for name in _ROW_COLUMNS}
+        self.codes = []
+        self.offerings = []
+
+    def add(self, course_id: str, course: Offering, course_reg: dict) -> None:
+        """Adds the allotment rows of an alloted course
+
+        Args:
+            course_id (str): id of the alloted course.
+            course (Offering): alloted course.
+            course_reg (dict): employee course registrations.
+        """
+        reg_ids = list(course.course_registered_ids)
+        if not reg_ids:
+            return
+        self.rows["reg_id"] += reg_ids
+        self.rows["email_id"] += [course_reg[reg_id].email_id
+                                  for reg_id in reg_ids]
+        self.codes += [len(self.offerings)] * len(reg_ids)
+        self.offerings.append((course_id, course.title, course.instructor,
+                               course.date, course.final_status))
+        if len(self.codes) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.codes:
+            self.writer.write(rows=self.rows, codes=self.codes,
+                              offerings=self.offerings)
+            self.__reset()
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read(path: str) -> dict:
+    """Reads an allotment export back
+
+    Args:
+        path (str): export file path.
+
+    Returns:
+        dict: column name -> list of values, in export order.
+    """
+    with open(path, "rb") as file_handle:
+        magic = file_handle.read(len(_PARQUET_MAGIC))
+    if magic == _PARQUET_MAGIC:
+        return _pyarrow().parquet.read_table(path).to_pydict()
+    numpy = _numpy()
+    columns = {name: [] for name in COLUMNS}
+    with numpy.load(path, allow_pickle=False) as archive:
+        batches = sorted({name.rsplit("-", 1)[1] for name in archive.files})
+        for batch in batches:
+            for name in _ROW_COLUMNS:
+                columns[name] += archive[f"{name}-{batch}"].tolist()
+            codes = archive[f"{_CODES}-{batch}"]
+            for name in _OFFERING_COLUMNS:
+                columns[name] += archive[f"{name}-{batch}"][codes].tolist()
+    return columns
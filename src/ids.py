@@ -0,0 +1,54 @@
+from config import config
+from src.constants import Constants
+import functools
+import sys
+
+# Registration ids are derived from the same employees over and over when
+# employees register for many courses, the names they are built from are
+# memoized in a small LRU cache.
+
+
+def offering_id(title: str, instructor: str) -> str:
+    """Id of the offering of a course by an instructor
+
+    Not memoized, an offering is added once. The id is interned, so it is
+    the same object as the offering ids parsed from later input lines.
+    """
+    return sys.intern(Constants.ID_COURSE_OFFERING.format(title, instructor))
+
+@functools.lru_cache(maxsize=config.ID_CACHE_SIZE)
+def employee_name(email_id: str, separator: str="@") -> str:
+    """Name part of an employee email id"""
+    return email_id.split(sep=separator)[0]
+
+def registration_id(email_id: str, title: str) -> str:
+    """Id of the registration of an employee for a course
+
+    Not memoized itself, an employee registers once per course so nearly
+    every call would miss. Only the name derived from the email is cached.
+    """
+    return Constants.ID_COURSE_REGISTRATION.format(employee_name(email_id),
+                                                   title)
+
+CACHES = {
+    "employee_name": employee_name,
+}
+
+def cache_stats() -> dict:
+    """Hit rates of the id caches
+
+    Returns:
+        dict: cache name -> (hits, misses, hit rate), the rate is None for a
+            cache that was never used.
+    """
+    stats = {}
+    for name, cache in CACHES.items():
+        info = cache.cache_info()
+        calls = info.hits + info.misses
+        stats[name] = (info.hits, info.misses,
+                       info.hits / calls if calls else None)
+    return stats
+
+def cache_clear() -> None:
+    for cache in CACHES.values():
+        cache.cache_clear()
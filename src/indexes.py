@@ -0,0 +1,63 @@
+from src.records import Offering, Registration
+
+
+def _add(index: dict, key: str, value: str) -> None:
+    # dicts with None values serve as insertion ordered sets
+    index.setdefault(key, {})[value] = None
+
+def _remove(index: dict, key: str, value: str) -> None:
+    values = index.get(key)
+    if values is not None:
+        values.pop(value, None)
+        if not values:
+            del index[key]
+
+
+class Indexes:
+    def __init__(self, positions: dict=None):
+        """Instantiates this class
+
+        Secondary indexes kept up to date by the handlers as offerings and
+        registrations are added or canceled. Offerings are listed by their
+        position in `courses`, which a re-added offering keeps like a dict
+        key does, so the order does not depend on when the indexes were
+        built.
+
+        Args:
+            positions (dict): course id -> position, kept up to date by the
+                caller, or None to number offerings as they are added.
+        """
+        self.by_email = {}
+        self.by_instructor = {}
+        self.by_date = {}
+        self.numbered = positions is None
+        self.positions = {} if positions is None else positions
+
+    @classmethod
+    def build(cls, courses: dict, course_reg: dict, positions: dict=None):
+        """Creates indexes for existing state, e.g. a restored snapshot"""
+        indexes = cls(positions=positions)
+        for course_id, course in courses.items():
+            indexes.add_offering(course_id=course_id, course=course)
+        for registration_id, registration in course_reg.items():
+            indexes.add_registration(registration_id=registration_id,
+                                     registration=registration)
+        return indexes
+
+    def add_offering(self, course_id: str, course: Offering) -> None:
+        if self.numbered and course_id not in self.positions:
+            self.positions[course_id] = len(self.positions)
+        _add(self.by_instructor, course.instructor, course_id)
+        _add(self.by_date, course.date, course_id)
+
+    def remove_offering(self, course_id: str, course: Offering) -> None:
+        _remove(self.by_instructor, course.instructor, course_id)
+        _remove(self.by_date, course.date, course_id)
+
+    def add_registration(self, registration_id: str,
+                         registration: Registration) -> None:
+        _add(self.by_email, registration.email_id, registration_id)
+
+    def remove_registration(self, registration_id: str,
+                            registration: Registration) -> None:
+        _remove(self.by_email, registration.email_id, registration_id)
@@ -0,0 +1,82 @@
+from src.engine import Engine
+from config import config
+import asyncio
+
+
+class AsyncIngestor:
+    def __init__(self, engine: Engine=None,
+                 max_pending: int=config.INGEST_QUEUE_SIZE,
+                 batch_size: int=config.INGEST_BATCH_SIZE):
+        """Instantiates this class
+
+        Many producers submit commands concurrently, a single consumer task
+        applies them to the shared engine in submission order. Commands of
+        the same offering are therefore applied in the order they were
+        submitted, and `slots_left` is never updated by two commands at once.
+
+        Args:
+            engine (Engine): engine owning the shared state.
+            max_pending (int): commands queued before `submit` waits, which
+                pushes back on producers.
+            batch_size (int): queued commands applied per consumer wake-up.
+        """
+        self.engine = engine if engine is not None else Engine()
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.queue = None
+        self.consumer = None
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self.consumer = asyncio.ensure_future(self.__consume())
+
+    async def submit(self, line: str):
+        """Queues a command and waits for its output
+
+        Args:
+            line (str): raw command line.
+
+        Returns:
+            str | tuple: command output, see `Engine.execute`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((line, future))
+        return await future
+
+    async def __consume(self) -> None:
+        queue, engine = self.queue, self.engine
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            for line, future in batch:
+                try:
+                    result = engine.execute(line)
+                    if result is not None and \
+                            not isinstance(result, (str, tuple)):
+                        result = tuple(result)
+                except Exception as err:
+                    if not future.cancelled():
+                        future.set_exception(err)
+                else:
+                    if not future.cancelled():
+                        future.set_result(result)
+                queue.task_done()
+            # let producers refill the queue before the next batch
+            await asyncio.sleep(0)
+
+    async def close(self) -> None:
+        """Waits for queued commands to be applied and stops the consumer"""
+        await self.queue.join()
+        self.consumer.cancel()
+        try:
+            await self.consumer
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
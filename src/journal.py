@@ -0,0 +1,205 @@
+from src.constants import Constants
+from src.engine import Engine
+from src import snapshot
+from src.waitlist import Waitlists
+from config import config
+from utils import utils
+import os
+import time
+import zlib
+
+_SEGMENT_PREFIX = "journal-"
+_SEGMENT_SUFFIX = ".log"
+_SNAPSHOT = "state.snapshot"
+# result suffixes that mark a command as a state change, None for always,
+# commands with several output lines are checked on the first one
+_STATE_CHANGES = {
+    config.ADD: None,
+    config.REGISTER: (f" {Constants.STATUS_ACCEPTED}",
+                      f" {Constants.STATUS_WAITLISTED}"),
+    config.ALLOT: None,
+    config.CANCEL: f" {Constants.CANCEL_ACCEPTED}",
+    config.ALLOT_ALL: None
+}
+
+
+def _segment_path(directory: str, sequence: int) -> str:
+    return os.path.join(directory,
+                        f"{_SEGMENT_PREFIX}{sequence:08d}{_SEGMENT_SUFFIX}")
+
+def _segments(directory: str) -> list:
+    segments = []
+    for name in os.listdir(directory):
+        if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+            sequence = int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+            segments.append((sequence, os.path.join(directory, name)))
+    return sorted(segments)
+
+def _prune(directory: str, covered: int) -> None:
+    for sequence, path in _segments(directory):
+        if sequence < covered:
+            os.remove(path)
+
+def _compact(engine: Engine, directory: str, covered: int) -> None:
+    snapshot.dump(engine=engine, path=os.path.join(directory, _SNAPSHOT),
+                  lines_applied=covered)
+    _prune(directory=directory, covered=covered)
+
+def _replay(engine: Engine, path: str) -> None:
+    replayed = 0
+    with open(path, "rb") as file_handle:
+        for record in file_handle:
+            if not record.endswith(b"\n"):
+                break
+            checksum, _, data = record[:-1].partition(b" ")
+            if checksum != b"%08x" % zlib.crc32(data):
+                break
+            command, params = utils.parse_line(data.decode())
+            engine.dispatch(command, params)
+            replayed += len(record)
+        else:
+            return
+    # later runs append to newer segments, the torn or corrupt tail is cut
+    # off so they are replayed after the records that precede it
+    with open(path, "r+b") as file_handle:
+        file_handle.truncate(replayed)
+
+def recover(directory: str, waitlist: bool=False) -> Engine:
+    """Rebuilds the engine state from a journal directory
+
+    The latest snapshot is loaded and the journal segments written after it
+    are replayed. A segment ending in a torn or corrupt record is truncated
+    to the last good record, and the segments after it are still replayed.
+
+    Args:
+        directory (str): journal directory, created if missing.
+        waitlist (bool): whether the journaled run used waitlists.
+
+    Returns:
+        Engine: engine holding the recovered state.
+    """
+    os.makedirs(directory, exist_ok=True)
+    engine, covered = Engine(), 0
+    snapshot_path = os.path.join(directory, _SNAPSHOT)
+    if os.path.isfile(snapshot_path):
+        engine, covered = snapshot.load(path=snapshot_path)
+    if waitlist and engine.waitlists is None:
+        engine.waitlists = Waitlists()
+    for sequence, path in _segments(directory):
+        if sequence >= covered:
+            _replay(engine=engine, path=path)
+    return engine
+
+
+class Journal:
+    def __init__(self, directory: str, engine: Engine,
+                 batch_size: int=config.JOURNAL_BATCH_SIZE,
+                 sync_interval: float=config.JOURNAL_SYNC_INTERVAL,
+                 compact_after: int=config.JOURNAL_COMPACT_AFTER):
+        """Instantiates this class
+
+        Every accepted state change is appended to the current segment of an
+        append-only journal. Records are written as they are accepted, so a
+        killed process loses none of them, and only the fsyncs are grouped,
+        an OS crash loses at most the records since the last one. Once
+        enough records piled up the state is compacted into a snapshot in
+        the background, after which older segments are removed.
+
+        Args:
+            directory (str): journal directory, see `recover`.
+            engine (Engine): engine whose state changes are journaled.
+            batch_size (int): records written per fsync.
+            sync_interval (float): seconds after which written records are
+                synced even if the batch is not full.
+            compact_after (int): records per segment before compaction.
+        """
+        self.directory = directory
+        self.engine = engine
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        segments = _segments(directory)
+        self.sequence = segments[-1][0] + 1 if segments else 0
+        self.file = self.__open()
+        # records written since the last fsync
+        self.unsynced = 0
+        self.records = 0
+        self.last_sync = time.monotonic()
+        self.compactor = None
+
+    def record(self, command: str, params: list, result) -> None:
+        """Appends a command to the journal if it changed the state
+
+        Args:
+            command (str): command name.
+            params (list): converted command arguments.
+            result (str | iterable): command output.
+        """
+        if command not in _STATE_CHANGES:
+            return
+        suffix = _STATE_CHANGES[command]
+        if suffix is not None:
+            line = result if isinstance(result, str) else result[0]
+            if not line.endswith(suffix):
+                return
+        data = " ".join([command, *map(str, params)])
+        self.file.write(f"{zlib.crc32(data.encode()):08x} {data}\n")
+        self.unsynced += 1
+        self.records += 1
+        if self.unsynced >= self.batch_size or \
+                time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+        if self.records >= self.compact_after:
+            self.compact()
+
+    def __open(self):
+        # line buffered, each record reaches the file as it is written
+        return open(_segment_path(self.directory, self.sequence), "a",
+                    buffering=1)
+
+    def sync(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def __reap(self, block: bool) -> bool:
+        if self.compactor is not None:
+            pid, _ = os.waitpid(self.compactor, 0 if block else os.WNOHANG)
+            if pid:
+                self.compactor = None
+        return self.compactor is None
+
+    def compact(self) -> None:
+        """Starts a new segment and snapshots the state covered so far
+
+        The snapshot is written by a forked child working on a copy-on-write
+        image of the state, so the engine keeps running meanwhile. Where fork
+        is unavailable the snapshot is written inline.
+        """
+        if not self.__reap(block=False):
+            return
+        self.sync()
+        self.file.close()
+        self.sequence += 1
+        self.file = self.__open()
+        self.records = 0
+        if not hasattr(os, "fork"):
+            _compact(engine=self.engine, directory=self.directory,
+                     covered=self.sequence)
+            return
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                _compact(engine=self.engine, directory=self.directory,
+                         covered=self.sequence)
+                status = 0
+            finally:
+                os._exit(status)
+        self.compactor = pid
+
+    def close(self) -> None:
+        self.sync()
+        self.file.close()
+        self.__reap(block=True)
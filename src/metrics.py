@@ -0,0 +1,84 @@
+from src import ids
+import time
+
+# latencies are bucketed by power of two nanoseconds
+_BUCKETS = 64
+
+
+class Metrics:
+    def __init__(self, clock=time.perf_counter_ns):
+        """Instantiates this class
+
+        Collects per command counts, cumulative time and a latency histogram
+        for validation and for the handler execution.
+
+        Args:
+            clock (callable): nanosecond clock.
+        """
+        self.clock = clock
+        self.counts = {}
+        self.execute_ns = {}
+        self.validate_ns = {}
+        self.histograms = {}
+
+    def record(self, command: str, validate_ns: int, execute_ns: int) -> None:
+        """Adds one command to the metrics
+
+        Args:
+            command (str): command name, `INPUT_DATA_ERROR` for invalid lines.
+            validate_ns (int): time spent parsing and validating the line.
+            execute_ns (int): time spent in the handler.
+        """
+        histogram = self.histograms.get(command)
+        if histogram is None:
+            histogram = self.histograms[command] = [0] * _BUCKETS
+            self.counts[command] = 0
+            self.execute_ns[command] = 0
+            self.validate_ns[command] = 0
+        self.counts[command] += 1
+        self.execute_ns[command] += execute_ns
+        self.validate_ns[command] += validate_ns
+        histogram[min((validate_ns + execute_ns).bit_length(),
+                      _BUCKETS - 1)] += 1
+
+    def percentile(self, command: str, percentile: float) -> int:
+        """Upper bound of a latency percentile, in nanoseconds"""
+        histogram = self.histograms[command]
+        target = self.counts[command] * percentile / 100
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= target and count:
+                return 2 ** bucket
+        return 0
+
+    def summary(self) -> str:
+        """Formats the metrics as a table followed by the histograms
+
+        Cumulative times are in milliseconds and latencies in microseconds,
+        percentiles are upper bounds of their histogram bucket. The hit rates
+        of the id caches come last.
+        """
+        rows = [f"{'command':<20} {'count':>10} {'validate ms':>12}"
+                f" {'execute ms':>12} {'p50 us':>9} {'p99 us':>9}"
+                f" {'max us':>9}"]
+        histograms = []
+        for command in sorted(self.counts):
+            buckets = [(bucket, count) for bucket, count in
+                       enumerate(self.histograms[command]) if count]
+            rows.append(
+                f"{command:<20} {self.counts[command]:>10}"
+                f" {self.validate_ns[command] / 1e6:>12.3f}"
+                f" {self.execute_ns[command] / 1e6:>12.3f}"
+                f" {self.percentile(command, 50) / 1e3:>9.1f}"
+                f" {self.percentile(command, 99) / 1e3:>9.1f}"
+                f" {2 ** buckets[-1][0] / 1e3:>9.1f}")
+            histograms.append(f"{command}: " + " ".join(
+                f"<={2 ** bucket / 1e3:g}us:{count}"
+                for bucket, count in buckets))
+        caches = [f"{'id cache':<20} {'hits':>10} {'misses':>12}"
+                  f" {'hit rate':>12}"]
+        for name, (hits, misses, rate) in ids.cache_stats().items():
+            caches.append(f"{name:<20} {hits:>10} {misses:>12}"
+                          f" {'-' if rate is None else f'{rate:.1%}':>12}")
+        return "\n".join(rows + histograms + caches)
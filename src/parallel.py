@@ -0,0 +1,113 @@
+from src.constants import Constants
+from src.engine import Engine
+from config import config
+from utils import utils
+from collections.abc import Iterable, Iterator
+import heapq
+
+
+class _Unpartitionable(Exception):
+    """Raised when commands of different titles may share state"""
+
+
+def _render(result):
+    if result is None or isinstance(result, str):
+        return result
+    return "\n".join(result)
+
+def _run_partition(lines: list) -> list:
+    return [_render(result) for result in Engine().execute_many(lines)]
+
+def _title_of(titles: dict, course_id: str) -> str:
+    title = titles.get(course_id)
+    if title is None:
+        raise _Unpartitionable(course_id)
+    return title
+
+def partition(lines: Iterable) -> tuple:
+    """Splits commands into partitions that do not share any state
+
+    Registration ids are built from the employee name and the course title,
+    so every offering of a title lands in the same partition.
+
+    Args:
+        lines (iterable): raw command lines.
+
+    Returns:
+        tuple: list with the output of invalid lines (None elsewhere), and a
+            dict mapping each title to its (index, line) entries.
+
+    Raises:
+        _Unpartitionable: if a command refers to an unknown id, an id could
+            belong to more than one title, or the command spans offerings.
+    """
+    titles, owners = {}, {}
+    outputs, partitions = [], {}
+    for index, line in enumerate(lines):
+        outputs.append(None)
+        parsed = utils.parse_line(line)
+        if parsed is None:
+            outputs[index] = Constants.INPUT_DATA_ERROR
+            continue
+        command, params = parsed
+        if command == config.ADD:
+            title = params[0]
+            course_id = Constants.ID_COURSE_OFFERING.format(*params[:2])
+            if titles.setdefault(course_id, title) != title:
+                raise _Unpartitionable(course_id)
+        elif command == config.REGISTER:
+            title = _title_of(titles=titles, course_id=params[1])
+            registration_id = Constants.ID_COURSE_REGISTRATION.format(
+                params[0].split("@")[0], title)
+            if owners.setdefault(registration_id, title) != title:
+                raise _Unpartitionable(registration_id)
+        elif command == config.ALLOT:
+            title = _title_of(titles=titles, course_id=params[0])
+        elif command == config.CANCEL:
+            title = _title_of(titles=owners, course_id=params[0])
+        else:
+            raise _Unpartitionable(command)
+        partitions.setdefault(title, []).append((index, line))
+    return outputs, partitions
+
+def _buckets(partitions: dict, workers: int) -> list:
+    # largest partitions first, each to the least loaded worker
+    buckets = [[] for _ in range(workers)]
+    loads = [(0, bucket) for bucket in range(workers)]
+    for entries in sorted(partitions.values(), key=len, reverse=True):
+        load, bucket = heapq.heappop(loads)
+        buckets[bucket].extend(entries)
+        heapq.heappush(loads, (load + len(entries), bucket))
+    return [sorted(bucket) for bucket in buckets if bucket]
+
+def execute_many(lines: Iterable, workers: int) -> Iterator:
+    """Runs commands of independent titles in a pool of processes
+
+    The whole input is partitioned up front, so unlike the serial path it is
+    held in memory. Inputs that cannot be partitioned safely run serially.
+
+    Args:
+        lines (iterable): raw command lines.
+        workers (int): number of worker processes.
+
+    Returns:
+        iterator: command outputs in input order, each rendered as a single
+            string (None for commands without output).
+    """
+    lines = list(lines)
+    try:
+        outputs, partitions = partition(lines=lines)
+    except _Unpartitionable:
+        return (_render(result) for result in Engine().execute_many(lines))
+    buckets = _buckets(partitions=partitions, workers=workers)
+    if len(buckets) < 2:
+        return (_render(result) for result in Engine().execute_many(lines))
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(len(buckets)) as pool:
+        results = pool.map(
+            _run_partition,
+            [[line for _, line in bucket] for bucket in buckets])
+        for bucket, rendered in zip(buckets, results):
+            for (index, _), output in zip(bucket, rendered):
+                outputs[index] = output
+    return iter(outputs)
@@ -0,0 +1,46 @@
+from src import compiled
+from config import config
+from collections.abc import Iterable, Iterator
+import collections
+import itertools
+
+
+def _chunks(lines: Iterable, size: int) -> Iterator:
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def commands(lines: Iterable, workers: int,
+             chunk_size: int=config.PIPELINE_CHUNK_LINES) -> Iterator:
+    """Parses and validates command lines in a pool of processes
+
+    Chunks of lines are tokenized, converted and validated by the workers,
+    which send each chunk back encoded like a compiled file, its distinct
+    argument values once followed by the command words. Chunks are decoded
+    in input order, and only a few chunks per worker are in flight, so
+    memory stays flat regardless of input size.
+
+    Args:
+        lines (iterable): raw command lines.
+        workers (int): number of worker processes.
+        chunk_size (int): number of lines sent to a worker at a time.
+
+    Returns:
+        iterator: command name and arguments of each line, or None for
+            invalid lines, see `utils.parse_line`.
+    """
+    import concurrent.futures
+    chunks = _chunks(lines=lines, size=chunk_size)
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        pending = collections.deque(
+            pool.submit(compiled.encode, chunk) for chunk in itertools.islice(
+                chunks, workers * config.PIPELINE_CHUNKS_PER_WORKER))
+        while pending:
+            words, values = pending.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(pool.submit(compiled.encode, chunk))
+            yield from compiled.decode(words=words, values=values)
@@ -0,0 +1,94 @@
+class _Query:
+    def __init__(self, courses, course_reg, build_indexes):
+        """Instantiates this class
+
+        Args:
+            courses (dict): available courses.
+            course_reg (dict): employee course registrations.
+            build_indexes (callable): returns the secondary indexes
+                answering the query, building them on first use.
+        """
+        self.courses = courses
+        self.course_reg = course_reg
+        self.build_indexes = build_indexes
+        self.indexes = None
+        # Archive answering for the records moved out of memory, when set
+        self.archive = None
+
+    def _indexes(self):
+        if self.indexes is None:
+            self.indexes = self.build_indexes()
+        return self.indexes
+
+    def _format_offerings(self, course_ids, archived: list) -> tuple:
+        # (position, course id, title, instructor, date) of each offering
+        positions = self._indexes().positions
+        offerings = [offering for offering in archived
+                     if offering[1] not in course_ids]
+        for course_id in course_ids:
+            course = self.courses.get(course_id)
+            offerings.append((positions[course_id], course_id, course.title,
+                              course.instructor, course.date))
+        offerings.sort()
+        return tuple(f'{course_id} {title} {instructor} {date}'
+                     for _, course_id, title, instructor, date in offerings)
+
+
+class ListRegistrations(_Query):
+    def execute(self, email_id: str) -> tuple:
+        """List the registrations of an employee
+
+        Args:
+            email_id (str): email id of the employee.
+
+        Returns:
+            tuple: one `<registration-id> <email-id> <course-offering-id>`
+                line per registration, in registration order.
+        """
+        registrations = [
+            (reg_id, self.course_reg.get(reg_id).course_id)
+            for reg_id in self._indexes().by_email.get(email_id, ())]
+        if self.archive is not None:
+            archived = self.archive.registrations_by_email(email_id)
+            if archived:
+                positions = self.course_reg.positions
+                archived += [(positions[reg_id], reg_id, course_id)
+                             for reg_id, course_id in registrations]
+                archived.sort()
+                registrations = [entry[1:] for entry in archived]
+        return tuple(f'{reg_id} {email_id} {course_id}'
+                     for reg_id, course_id in registrations)
+
+
+class ListOfferingsByInstructor(_Query):
+    def execute(self, instructor: str) -> tuple:
+        """List the offerings taught by an instructor
+
+        Args:
+            instructor (str): instructor name.
+
+        Returns:
+            tuple: one `<course-offering-id> <title> <instructor> <date>`
+                line per offering, in the order they were first added.
+        """
+        archived = [] if self.archive is None else \
+            self.archive.offerings_by_instructor(instructor)
+        return self._format_offerings(
+            self._indexes().by_instructor.get(instructor, ()), archived)
+
+
+class ListOfferingsByDate(_Query):
+    def execute(self, date: str) -> tuple:
+        """List the offerings on a date
+
+        Args:
+            date (str): offering date in ddmmyyyy format.
+
+        Returns:
+            tuple: one `<course-offering-id> <title> <instructor> <date>`
+                line per offering, in the order they were first added.
+        """
+        archived = [] if self.archive is None else \
+            self.archive.offerings_by_date(date)
+        return self._format_offerings(self._indexes().by_date.get(date, ()),
+                                      archived)
@@ -0,0 +1,97 @@
+import bisect
+
+
+class _Record:
+    __slots__ = ()
+
+    def get(self, key: str, default=None):
+        """Reads a field by name, like the dict records this replaces"""
+        return getattr(self, key, default)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field)
+                   for field in self._fields)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}"
+                           for field in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class SortedIds:
+    """Set of registration ids kept in sorted order as they are added"""
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids=()):
+        self._ids = sorted(set(ids))
+
+    def add(self, reg_id: str) -> None:
+        ids = self._ids
+        index = bisect.bisect_left(ids, reg_id)
+        if index == len(ids) or ids[index] != reg_id:
+            ids.insert(index, reg_id)
+
+    def remove(self, reg_id: str) -> None:
+        ids = self._ids
+        index = bisect.bisect_left(ids, reg_id)
+        if index == len(ids) or ids[index] != reg_id:
+            raise KeyError(reg_id)
+        del ids[index]
+
+    def __contains__(self, reg_id: str) -> bool:
+        ids = self._ids
+        index = bisect.bisect_left(ids, reg_id)
+        return index != len(ids) and ids[index] == reg_id
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __eq__(self, other):
+        if isinstance(other, SortedIds):
+            return self._ids == other._ids
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SortedIds({self._ids!r})"
+
+
+class Offering(_Record):
+    """A course offering. Field names match the `Constants` keys."""
+    __slots__ = ("title", "instructor", "min_emp", "max_emp", "slots_left",
+                 "date", "final_status", "alloted", "course_registered_ids",
+                 "allotments")
+    # fields that make up the record, the rest are caches
+    _fields = __slots__[:-1]
+
+    def __init__(self, title: str, instructor: str, min_emp: int,
+                 max_emp: int, slots_left: int, date: str,
+                 final_status: str=None, alloted: bool=False,
+                 course_registered_ids: SortedIds=None,
+                 allotments: tuple=None):
+        self.title = title
+        self.instructor = instructor
+        self.min_emp = min_emp
+        self.max_emp = max_emp
+        self.slots_left = slots_left
+        self.date = date
+        self.final_status = final_status
+        self.alloted = alloted
+        self.course_registered_ids = course_registered_ids \
+            if course_registered_ids is not None else SortedIds()
+        # formatted ALLOT output, reset whenever the registrations change
+        self.allotments = allotments
+
+
+class Registration(_Record):
+    """An employee registration. Field names match the `Constants` keys."""
+    __slots__ = ("course_id", "email_id")
+    _fields = __slots__
+
+    def __init__(self, course_id: str, email_id: str):
+        self.course_id = course_id
+        self.email_id = email_id
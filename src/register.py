@@ -1,36 +1,42 @@
+from src import ids
 from src.constants import Constants
+from src.records import Offering, Registration
 
 
 class Register:
-    def __init__(self, courses, course_reg):
+    def __init__(self, courses, course_reg, indexes=None):
         """Instantiates this class
 
         Args:
             courses (dict): available courses.
             course_reg (dict): employee course registrations.
+            indexes (Indexes): secondary indexes to keep up to date.
         """
         self.courses = courses
         self.course_reg = course_reg
+        self.indexes = indexes
+        # Waitlists that full courses queue registrations on, when set
+        self.waitlists = None
 
     def __register_course(self, registration_id: str, values: list) -> None:
-        self.course_reg[registration_id] = {
-            Constants.course_id: values[0],
-            Constants.email_id: values[1]
-        }
+        registration = Registration(*values)
+        if self.indexes is not None:
+            self.indexes.add_registration(registration_id=registration_id,
+                                          registration=registration)
+        self.course_reg[registration_id] = registration
 
-    def __set_id(self, values: list) -> str:
-        return Constants.ID_COURSE_REGISTRATION.format(*values)
-
-    def update(self, course, course_id, registration_id: str) -> dict:
-        course[Constants.course_registered_ids].add(registration_id)
-        course[Constants.slots_left] -= 1
+    def update(self, course: Offering, course_id: str,
+               registration_id: str) -> None:
+        course.course_registered_ids.add(registration_id)
+        course.slots_left -= 1
+        course.allotments = None
         self.courses[course_id] = course
 
-    def get_course(self, course_id: str) -> dict:
+    def get_course(self, course_id: str) -> Offering:
         return self.courses.get(course_id)
 
     def get_name(self, email_id: str, separator: str="@") -> str:
-        return email_id.split(sep=separator)[0]
+        return ids.employee_name(email_id, separator)
 
     def execute(self, email_id: str, course_id: str) -> None:
         """Register an employee for a course
@@ -41,15 +47,19 @@ class Register:
                 wants to register.
 
         Returns:
-            tuple: updated courses and employee registrations.
+            str: registration id and status, or an error status when the
+                registration id is already taken or the course is full.
+                With waitlists, full courses queue the registration and
+                answer WAITLISTED instead.
         """
         course = self.get_course(course_id)
-        emp_name = self.get_name(email_id=email_id)
-        course_name = course.get(Constants.title)
-        course_registration_id = self.__set_id(
-            values=[emp_name, course_name]
-        )
-        if course.get(Constants.slots_left):
+        course_registration_id = ids.registration_id(email_id, course.title)
+        waitlists = self.waitlists
+        if course_registration_id in self.course_reg or (
+                waitlists is not None and
+                course_registration_id in waitlists):
+            return f'{Constants.STATUS_DUPLICATE}'
+        if course.slots_left:
             self.__register_course(
                 registration_id=course_registration_id,
                 values=[course_id, email_id]
@@ -59,4 +69,9 @@ class Register:
                 registration_id=course_registration_id
             )
             return f'{course_registration_id} {Constants.STATUS_ACCEPTED}'
+        if waitlists is not None:
+            waitlists.add(course_id=course_id,
+                          registration_id=course_registration_id,
+                          email_id=email_id)
+            return f'{course_registration_id} {Constants.STATUS_WAITLISTED}'
         return f'{Constants.STATUS_COURSE_FULL}'
@@ -0,0 +1,128 @@
+from src.constants import Constants
+from src.engine import Engine
+from config import config
+from utils import output
+import io
+import os
+import socket
+import socketserver
+import sys
+import traceback
+
+
+class _Batch:
+    def __init__(self, lines):
+        """Instantiates this class
+
+        Args:
+            lines (iterator): shared line iterator, read up to the next
+                end of batch marker.
+        """
+        self.lines = lines
+        self.ended = False
+
+    def __iter__(self):
+        for line in self.lines:
+            if line.rstrip("\r\n") == config.END_OF_BATCH:
+                self.ended = True
+                return
+            yield line
+
+
+def run_batch(lines, stream, **kwargs) -> None:
+    """Runs a batch of commands on a fresh engine, like a separate app run
+
+    A command that fails ends the batch, not the server: the output so far
+    is followed by a `BATCH_ERROR` line, the rest of the batch is skipped
+    and the traceback goes to stderr.
+
+    Args:
+        lines (iterable): raw command lines.
+        stream (file): text stream the output is written to.
+        kwargs: `OutputWriter` options.
+    """
+    with output.OutputWriter(stream=stream, **kwargs) as writer:
+        try:
+            for result in Engine().execute_many(lines):
+                writer.write(result)
+        except Exception as err:
+            traceback.print_exc(file=sys.stderr)
+            writer.write(f"{Constants.BATCH_ERROR} {type(err).__name__}:"
+                         f" {err}")
+            for _ in lines:
+                pass
+
+
+class _BatchHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        lines = io.TextIOWrapper(self.rfile, encoding="utf-8")
+        stream = io.TextIOWrapper(self.wfile, encoding="utf-8")
+        try:
+            run_batch(lines, stream, **self.server.writer_options)
+        finally:
+            stream.flush()
+            stream.detach()
+            lines.detach()
+
+
+def serve_socket(path: str, **kwargs) -> None:
+    """Executes one command batch per connection on a unix socket
+
+    Clients send their commands, shut down their side of the connection and
+    read the output until the server closes it, e.g. with
+    `nc -U -N <path> < input.txt`.
+
+    Args:
+        path (str): socket path, replaced if it exists.
+        kwargs: `OutputWriter` options.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, _BatchHandler) as server:
+        server.writer_options = kwargs
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(path)
+
+def serve_stdio(**kwargs) -> None:
+    """Executes command batches read from stdin until it is closed
+
+    Batches end with an `END_OF_BATCH` line, which is echoed once the batch
+    output has been written and flushed.
+
+    Args:
+        kwargs: `OutputWriter` options.
+    """
+    lines = iter(sys.stdin.readline, "")
+    while True:
+        batch = _Batch(lines)
+        run_batch(batch, sys.stdout, **kwargs)
+        if not batch.ended:
+            return
+        sys.stdout.write(f"{config.END_OF_BATCH}\n")
+        sys.stdout.flush()
+
+def request(path: str, lines) -> str:
+    """Sends a command batch to a server and returns its output
+
+    Args:
+        path (str): socket path of a server started with `--serve`.
+        lines (iterable): raw command lines, newline terminated.
+
+    Returns:
+        str: output of the batch.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall("".join(lines).encode())
+        client.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = client.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks).decode()
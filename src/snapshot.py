@@ -0,0 +1,144 @@
+from src.constants import Constants
+from src.engine import Engine
+from src.records import Offering, Registration, SortedIds
+from src.waitlist import Waitlists
+import array
+import mmap
+import os
+import struct
+import sys
+
+# magic, lines applied, number of strings, offerings and registrations
+_HEADER = struct.Struct("<8sQIII")
+# id, title, instructor, date, min, max, slots left, alloted, final status
+# and number of registration ids, strings are indexes in the string table
+_OFFERING = struct.Struct("<IIIIqqq?BI")
+# registration id, course id, email id
+_REGISTRATION = struct.Struct("<III")
+_LENGTH = struct.Struct("<I")
+# version 2 appends the number of waiters and a registration record for
+# each, in arrival order
+_MAGIC = b"GKSNAP02"
+_MAGIC_V1 = b"GKSNAP01"
+_STATUSES = (None, Constants.FINAL_STATUS_CONFIRMED,
+             Constants.FINAL_STATUS_CANCELED)
+
+
+class _StringTable:
+    def __init__(self):
+        self.indexes = {}
+
+    def __call__(self, value: str) -> int:
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+        return index
+
+
+def dump(engine: Engine, path: str, lines_applied: int=0) -> None:
+    """Writes the engine state to a binary snapshot file
+
+    The file is written next to `path` and moved in place, so a crash never
+    leaves a partial snapshot behind.
+
+    Args:
+        engine (Engine): engine whose state is saved.
+        path (str): snapshot file path.
+        lines_applied (int): number of input lines the state reflects.
+    """
+    strings = _StringTable()
+    offerings = bytearray()
+    for course_id, course in engine.courses.items():
+        reg_ids = array.array("I", map(strings, course.course_registered_ids))
+        offerings += _OFFERING.pack(
+            strings(course_id), strings(course.title),
+            strings(course.instructor), strings(course.date),
+            course.min_emp, course.max_emp, course.slots_left,
+            course.alloted, _STATUSES.index(course.final_status),
+            len(reg_ids))
+        offerings += reg_ids.tobytes()
+    registrations = bytearray()
+    for reg_id, registration in engine.course_reg.items():
+        registrations += _REGISTRATION.pack(
+            strings(reg_id), strings(registration.course_id),
+            strings(registration.email_id))
+    waiters = engine.waitlists.entries() if engine.waitlists is not None \
+        else []
+    registrations += _LENGTH.pack(len(waiters))
+    for course_id, reg_id, email_id in waiters:
+        registrations += _REGISTRATION.pack(
+            strings(reg_id), strings(course_id), strings(email_id))
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file_handle:
+        file_handle.write(_HEADER.pack(
+            _MAGIC, lines_applied, len(strings.indexes),
+            len(engine.courses), len(engine.course_reg)))
+        for value in strings.indexes:
+            encoded = value.encode()
+            file_handle.write(_LENGTH.pack(len(encoded)))
+            file_handle.write(encoded)
+        file_handle.write(offerings)
+        file_handle.write(registrations)
+        file_handle.flush()
+        os.fsync(file_handle.fileno())
+    os.replace(temp_path, path)
+
+def load(path: str) -> tuple:
+    """Restores an engine from a snapshot file
+
+    The file is memory-mapped and decoded in place, strings are interned
+    like the ones parsed from input lines.
+
+    Args:
+        path (str): snapshot file path.
+
+    Returns:
+        tuple: restored engine and the number of input lines it reflects.
+    """
+    with open(path, "rb") as file_handle, \
+            mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, lines_applied, num_strings, num_offerings, num_registrations = \
+            _HEADER.unpack_from(data, 0)
+        if magic not in (_MAGIC, _MAGIC_V1):
+            raise ValueError(f"{path} is not a snapshot file")
+        offset = _HEADER.size
+        strings = []
+        for _ in range(num_strings):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            strings.append(
+                sys.intern(data[offset:offset + length].decode()))
+            offset += length
+        courses = {}
+        for _ in range(num_offerings):
+            (course_id, title, instructor, date, min_emp, max_emp, slots_left,
+             alloted, status, num_reg_ids) = _OFFERING.unpack_from(data, offset)
+            offset += _OFFERING.size
+            reg_ids = array.array("I")
+            reg_ids.frombytes(data[offset:offset + num_reg_ids * reg_ids.itemsize])
+            offset += num_reg_ids * reg_ids.itemsize
+            courses[strings[course_id]] = Offering(
+                strings[title], strings[instructor], min_emp, max_emp,
+                slots_left, strings[date], final_status=_STATUSES[status],
+                alloted=alloted, course_registered_ids=SortedIds(
+                    strings[index] for index in reg_ids))
+        course_reg = {}
+        for reg_id, course_id, email_id in _REGISTRATION.iter_unpack(
+                data[offset:offset + num_registrations * _REGISTRATION.size]):
+            course_reg[strings[reg_id]] = Registration(
+                strings[course_id], strings[email_id])
+        offset += num_registrations * _REGISTRATION.size
+        waitlists = None
+        if magic == _MAGIC:
+            (num_waiters,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if num_waiters:
+                waitlists = Waitlists()
+            for reg_id, course_id, email_id in _REGISTRATION.iter_unpack(
+                    data[offset:offset + num_waiters * _REGISTRATION.size]):
+                waitlists.add(course_id=strings[course_id],
+                              registration_id=strings[reg_id],
+                              email_id=strings[email_id])
+    engine = Engine(courses=courses, course_reg=course_reg)
+    engine.waitlists = waitlists
+    return engine, lines_applied
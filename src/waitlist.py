@@ -0,0 +1,77 @@
+import heapq
+
+
+class Waitlists:
+    def __init__(self):
+        """Instantiates this class
+
+        One queue per offering of the registrations that arrived while it
+        was full, served in arrival order. Queues are heaps of
+        (arrival, registration id), waiters that cancel are skipped lazily
+        when they reach the front.
+        """
+        self.queues = {}
+        # registration id -> (arrival, course id, email id), in arrival order
+        self.waiting = {}
+        self.arrivals = 0
+
+    def add(self, course_id: str, registration_id: str,
+            email_id: str) -> None:
+        arrival = self.arrivals
+        self.arrivals += 1
+        self.waiting[registration_id] = (arrival, course_id, email_id)
+        heapq.heappush(self.queues.setdefault(course_id, []),
+                       (arrival, registration_id))
+
+    def remove(self, registration_id: str) -> bool:
+        """Takes a waiter off its waitlist, False if it is not waiting"""
+        return self.waiting.pop(registration_id, None) is not None
+
+    def pop(self, course_id: str):
+        """Takes the first waiter of an offering off its waitlist
+
+        Args:
+            course_id (str): id of the offering.
+
+        Returns:
+            tuple: registration id and email id of the waiter, or None if
+                nobody is waiting.
+        """
+        queue = self.queues.get(course_id)
+        while queue:
+            arrival, registration_id = heapq.heappop(queue)
+            waiter = self.waiting.get(registration_id)
+            if waiter is not None and waiter[0] == arrival:
+                del self.waiting[registration_id]
+                return registration_id, waiter[2]
+        self.queues.pop(course_id, None)
+        return None
+
+    def drop(self, course_id: str) -> int:
+        """Empties the waitlist of an offering, once it is alloted
+
+        Args:
+            course_id (str): id of the offering.
+
+        Returns:
+            int: number of waiters dropped.
+        """
+        dropped = 0
+        for arrival, registration_id in self.queues.pop(course_id, ()):
+            waiter = self.waiting.get(registration_id)
+            if waiter is not None and waiter[0] == arrival:
+                del self.waiting[registration_id]
+                dropped += 1
+        return dropped
+
+    def entries(self) -> list:
+        """Waiters as (course id, registration id, email id), in order"""
+        return [(course_id, registration_id, email_id)
+                for registration_id, (_, course_id, email_id)
+                in self.waiting.items()]
+
+    def __contains__(self, registration_id: str) -> bool:
+        return registration_id in self.waiting
+
+    def __len__(self) -> int:
+        return len(self.waiting)
@@ -4,8 +4,29 @@ from src.add import Add
 from src.allot import Allot
 from src.cancel import Cancel
 from src.constants import Constants
+from src.records import Registration
+from src.engine import Engine
+from src import parallel
+from src import snapshot
+from src import journal
+from src.metrics import Metrics
+from src import server
+from src import ids
+from src import export
+from src import compiled
+from src import batch
+from src import pipeline
+from src.archive import Archive
+from src.waitlist import Waitlists
+from src.ingest import AsyncIngestor
+import asyncio
 from utils import exceptions
 from utils import utils
+from utils import output
+import contextlib
+import io
+import os
+import tempfile
 
 
 class TestApp(unittest.TestCase):
@@ -33,6 +54,24 @@ class TestApp(unittest.TestCase):
         self.assertEqual(expected_slots_left,
                          courses.courses.get(course_id).get("slots_left"))
 
+    def test_register_duplicate(self):
+        engine = Engine()
+        engine.execute("ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3")
+        engine.execute("ADD-COURSE-OFFERING PYTHON BOB 05062022 1 3")
+        engine.execute("REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN")
+        for line in ["REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN",
+                     "REGISTER ANDY@YAHOO.COM OFFERING-PYTHON-JOHN",
+                     "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-BOB"]:
+            self.assertEqual(Constants.STATUS_DUPLICATE, engine.execute(line))
+        self.assertEqual(2, engine.courses["OFFERING-PYTHON-JOHN"].slots_left)
+        self.assertEqual(3, engine.courses["OFFERING-PYTHON-BOB"].slots_left)
+        self.assertEqual(
+            "REG-COURSE-ANDY-PYTHON CANCEL_ACCEPTED",
+            engine.execute("CANCEL REG-COURSE-ANDY-PYTHON"))
+        self.assertEqual(
+            "REG-COURSE-ANDY-PYTHON ACCEPTED",
+            engine.execute("REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-BOB"))
+
     def test_register(self):
         courses = Add()
         courses.execute("Advanced Physics", "Stephen Hawking", "120123", 1, 2)
@@ -41,10 +80,10 @@ class TestApp(unittest.TestCase):
         courses = Register(courses.courses, courses.course_reg)
         courses.execute(email_id=email_id, course_id=course_id)
         expected_course_reg_dict = {
-            "REG-COURSE-test-Advanced Physics": {
-                "course_id": course_id,
-                "email_id": email_id
-            }
+            "REG-COURSE-test-Advanced Physics": Registration(
+                course_id=course_id,
+                email_id=email_id
+            )
         }
         self.assertEqual(expected_course_reg_dict, courses.course_reg)
         slots_left = 1
@@ -74,6 +113,40 @@ class TestApp(unittest.TestCase):
         self.assertEqual(expected_allotment_status,
                          courses.courses.get(course_id).get("alloted"))
 
+    def test_allot_reuses_formatted_output(self):
+        engine = Engine()
+        engine.execute("ADD-COURSE-OFFERING PY JOHN 05062022 1 3")
+        engine.execute("REGISTER WOO@GMAIL.COM OFFERING-PY-JOHN")
+        engine.execute("REGISTER ANDY@GMAIL.COM OFFERING-PY-JOHN")
+        output = engine.execute("ALLOT OFFERING-PY-JOHN")
+        self.assertEqual("REG-COURSE-ANDY-PY", output[0].split()[0])
+        self.assertIs(output, engine.execute("ALLOT OFFERING-PY-JOHN"))
+        engine.execute("REGISTER BOB@GMAIL.COM OFFERING-PY-JOHN")
+        output = engine.execute("ALLOT OFFERING-PY-JOHN")
+        self.assertEqual(3, len(output))
+        self.assertEqual("REG-COURSE-BOB-PY", output[1].split()[0])
+
+    def test_allot_all_matches_allot(self):
+        commands = [
+            "ADD-COURSE-OFFERING PY JOHN 05062022 1 3",
+            "ADD-COURSE-OFFERING GO BOB 05062022 2 3",
+            "ADD-COURSE-OFFERING ML BOB 05062022 1 3",
+            "REGISTER WOO@GMAIL.COM OFFERING-PY-JOHN",
+            "REGISTER ANDY@GMAIL.COM OFFERING-GO-BOB",
+        ]
+        engine = Engine()
+        list(engine.execute_many(commands))
+        expected_output = []
+        for course_id in engine.courses:
+            expected_output.extend(
+                engine.execute(f"ALLOT {course_id}") or [""])
+        engine = Engine()
+        list(engine.execute_many(commands))
+        output = list(engine.execute("ALLOT-ALL\n"))
+        self.assertEqual(expected_output, output)
+        self.assertEqual(["OFFERING-GO-BOB", "OFFERING-ML-BOB"],
+                         engine.handlers["ALLOT-ALL"].pending())
+
     def test_cancel_accepted(self):
         courses = Add()
         courses.execute("Advanced Physics", "Stephen Hawking", "120123", 1, 2)
@@ -152,6 +225,11 @@ class TestApp(unittest.TestCase):
         else:
             self.assertIsInstance(abs_path, str)
 
+    def test_utils_stream_file(self):
+        lines = utils.stream_file(["geektrust.py", "sample_input/input1.txt"])
+        self.assertNotIsInstance(lines, list)
+        self.assertEqual(len(list(lines)), 4)
+
     def test_utils_detect_command(self):
         args = utils.detect_command(("ADD-COURSE-OFFERING DATASCIENCE BOB"
                              " 05062022 1 3\n"))
@@ -180,5 +258,499 @@ class TestApp(unittest.TestCase):
         else:
             assert False
 
+    def test_parallel_matches_serial(self):
+        commands = [
+            "ADD-COURSE-OFFERING PY JOHN 05062022 1 3",
+            "ADD-COURSE-OFFERING GO BOB 05062022 1 1",
+            "REGISTER WOO@GMAIL.COM OFFERING-PY-JOHN",
+            "REGISTER WOO@GMAIL.COM OFFERING-GO-BOB",
+            "REGISTER ANDY@GMAIL.COM OFFERING-GO-BOB",
+            "ALLOT",
+            "CANCEL REG-COURSE-WOO-GO",
+            "ALLOT OFFERING-PY-JOHN",
+        ]
+        expected_output = [
+            parallel._render(result)
+            for result in Engine().execute_many(commands)
+        ]
+        output = list(parallel.execute_many(commands, workers=2))
+        self.assertEqual(expected_output, output)
+        _, partitions = parallel.partition(commands)
+        self.assertEqual(["PY", "GO"], list(partitions))
+
+    def test_snapshot_round_trip(self):
+        engine = Engine()
+        with open("sample_input/input2.txt") as file_handle:
+            list(engine.execute_many(file_handle))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.snapshot")
+            snapshot.dump(engine=engine, path=path, lines_applied=6)
+            restored, lines_applied = snapshot.load(path=path)
+        self.assertEqual(6, lines_applied)
+        self.assertEqual(engine.courses, restored.courses)
+        self.assertEqual(engine.course_reg, restored.course_reg)
+        course = restored.courses.get("OFFERING-PYTHON-JOHN")
+        self.assertEqual(Constants.FINAL_STATUS_CONFIRMED,
+                         course.final_status)
+        self.assertEqual(["REG-COURSE-ANDY-PYTHON", "REG-COURSE-WOO-PYTHON"],
+                         list(course.course_registered_ids))
+
+    def test_journal_recover(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = journal.recover(directory=directory)
+            engine.journal = journal.Journal(directory=directory,
+                                             engine=engine, batch_size=2,
+                                             compact_after=3)
+            with open("sample_input/input2.txt") as file_handle:
+                list(engine.execute_many(file_handle))
+            engine.execute("REGISTER NEW@GMAIL.COM OFFERING-PYTHON-JOHN")
+            engine.journal.close()
+            with open(os.path.join(directory, "journal-00000002.log"),
+                      "a") as file_handle:
+                file_handle.write("0badc0de CANCEL REG-COURSE-NEW-PY")
+            recovered = journal.recover(directory=directory)
+            self.assertTrue(os.path.isfile(
+                os.path.join(directory, "state.snapshot")))
+        self.assertEqual(engine.courses, recovered.courses)
+        self.assertEqual(engine.course_reg, recovered.course_reg)
+
+    def test_journal_recover_torn_segment(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = journal.recover(directory=directory)
+            engine.journal = journal.Journal(directory=directory,
+                                             engine=engine)
+            engine.execute("ADD-COURSE-OFFERING PY JOHN 05062022 1 3")
+            engine.journal.close()
+            with open(os.path.join(directory, "journal-00000000.log"),
+                      "a") as file_handle:
+                file_handle.write("0badc0de REGISTER A@X.COM OFF")
+            engine = journal.recover(directory=directory)
+            engine.journal = journal.Journal(directory=directory,
+                                             engine=engine)
+            engine.execute("REGISTER C@X.COM OFFERING-PY-JOHN")
+            engine.journal.close()
+            recovered = journal.recover(directory=directory)
+        self.assertEqual(("REG-COURSE-C-PY C@X.COM OFFERING-PY-JOHN",),
+                         recovered.execute("LIST-REGISTRATIONS C@X.COM"))
+
+    def test_journal_recover_unsynced(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = journal.recover(directory=directory)
+            engine.journal = journal.Journal(directory=directory,
+                                             engine=engine, sync_interval=60)
+            engine.execute("ADD-COURSE-OFFERING PY JOHN 05062022 1 3")
+            # a killed process never closes its journal
+            recovered = journal.recover(directory=directory)
+            engine.journal.close()
+        self.assertEqual(engine.courses, recovered.courses)
+
+    def test_engine_metrics(self):
+        engine = Engine(metrics=Metrics())
+        with open("sample_input/input2.txt") as file_handle:
+            list(engine.execute_many(file_handle))
+        list(engine.execute_many(["ALLOT"]))
+        self.assertEqual(3, engine.metrics.counts["REGISTER"])
+        self.assertEqual(1, engine.metrics.counts["INPUT_DATA_ERROR"])
+        self.assertEqual(0, engine.metrics.execute_ns["INPUT_DATA_ERROR"])
+        self.assertEqual(3, sum(engine.metrics.histograms["REGISTER"]))
+        self.assertIn("CANCEL", engine.metrics.summary())
+
+    def test_metrics_rejected_options(self):
+        for arguments in (["x.txt", "--metrics", "--workers", "2"],
+                          ["--metrics", "--serve", "-"]):
+            with self.assertRaises(exceptions.INPUT_DATA_ERROR):
+                utils.parse_args(["geektrust", *arguments])
+
+    def test_server_batches(self):
+        lines = iter([
+            "ADD-COURSE-OFFERING PY JOHN 05062022 1 3\n",
+            "END-OF-BATCH\n",
+            "ADD-COURSE-OFFERING GO BOB 05062022 1 3\n",
+        ])
+        first, second = io.StringIO(), io.StringIO()
+        batch = server._Batch(lines)
+        server.run_batch(batch, first)
+        self.assertTrue(batch.ended)
+        batch = server._Batch(lines)
+        server.run_batch(batch, second)
+        self.assertFalse(batch.ended)
+        self.assertEqual("OFFERING-PY-JOHN\n", first.getvalue())
+        self.assertEqual("OFFERING-GO-BOB\n", second.getvalue())
+
+    def test_server_batch_error(self):
+        lines = iter([
+            "ADD-COURSE-OFFERING PY JOHN 05062022 1 3\n",
+            "CANCEL REG-COURSE-NOBODY-PY\n",
+            "ADD-COURSE-OFFERING JS JOHN 05062022 1 3\n",
+            "END-OF-BATCH\n",
+            "ADD-COURSE-OFFERING GO BOB 05062022 1 3\n",
+        ])
+        first, second = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stderr(io.StringIO()):
+            server.run_batch(server._Batch(lines), first)
+        server.run_batch(server._Batch(lines), second)
+        outputs = first.getvalue().splitlines()
+        self.assertEqual("OFFERING-PY-JOHN", outputs[0])
+        self.assertTrue(outputs[1].startswith("BATCH_ERROR "))
+        self.assertEqual(2, len(outputs))
+        self.assertEqual("OFFERING-GO-BOB\n", second.getvalue())
+
+    def test_async_ingestor(self):
+        async def producer(ingestor, name):
+            registered = await ingestor.submit(
+                f"REGISTER {name}@GMAIL.COM OFFERING-PY-JOHN")
+            if registered.endswith(" ACCEPTED"):
+                return await ingestor.submit(
+                    f"CANCEL {registered.split()[0]}")
+            return registered
+
+        async def run():
+            async with AsyncIngestor(max_pending=2, batch_size=3) as ingestor:
+                await ingestor.submit(
+                    "ADD-COURSE-OFFERING PY JOHN 05062022 1 2")
+                outputs = await asyncio.gather(*(
+                    producer(ingestor, f"E{i}") for i in range(10)))
+            return ingestor.engine, outputs
+
+        engine, outputs = asyncio.run(run())
+        course = engine.courses.get("OFFERING-PY-JOHN")
+        self.assertEqual(2, course.slots_left)
+        self.assertEqual(0, len(course.course_registered_ids))
+        self.assertTrue(all(output.endswith("CANCEL_ACCEPTED") or
+                            output == "COURSE_FULL_ERROR"
+                            for output in outputs))
+
+    def test_utils_parse_args(self):
+        options = utils.parse_args(["geektrust.py", "input.txt"])
+        self.assertEqual("input.txt", options.path)
+        self.assertEqual(1, options.workers)
+        options = utils.parse_args(["geektrust.py", "--serve", "-"])
+        self.assertIsNone(options.path)
+        self.assertEqual(1, options.workers)
+        with self.assertRaises(exceptions.INPUT_DATA_ERROR):
+            utils.parse_args(["geektrust.py", "--workers", "2"])
+
+    def test_utils_parse_line(self):
+        output = utils.parse_line("REGISTER WOO@GMAIL.COM OFFERING-PY-JOHN\n")
+        expected_output = ("REGISTER", ["WOO@GMAIL.COM", "OFFERING-PY-JOHN"])
+        self.assertEqual(expected_output, output)
+        self.assertIsNone(utils.parse_line(
+            "ADD-COURSE-OFFERING PY JOHN 05062022 one 3"))
+        self.assertIsNone(utils.parse_line(
+            "ADD-COURSE-OFFERING PY JOHN 29022023 1 3"))
+
+    def test_utils_valid_date(self):
+        self.assertTrue(utils.valid_date("29022024"))
+        self.assertFalse(utils.valid_date("29021900"))
+        self.assertFalse(utils.valid_date("31042022"))
+        self.assertFalse(utils.valid_date("0106202"))
+
+    def test_output_writer(self):
+        stream = io.StringIO()
+        with output.OutputWriter(stream=stream, buffer_size=2) as writer:
+            writer.write("OFFERING-DATASCIENCE-BOB")
+            writer.write(line for line in ["REG-1 A", "REG-2 B", "REG-3 C"])
+            writer.write([])
+        expected_output = "OFFERING-DATASCIENCE-BOB\nREG-1 A\nREG-2 B\nREG-3 C\n\n"
+        self.assertEqual(expected_output, stream.getvalue())
+
+    def test_engine_execute(self):
+        engine = Engine()
+        output = engine.execute("ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3")
+        self.assertEqual("OFFERING-PYTHON-JOHN", output)
+        output = engine.execute("ALLOT")
+        self.assertEqual(Constants.INPUT_DATA_ERROR, output)
+
+    def test_engine_execute_many(self):
+        engine = Engine()
+        with open("sample_input/input2.txt") as file_handle:
+            outputs = [
+                output if isinstance(output, str) else list(output)
+                for output in engine.execute_many(file_handle)
+            ]
+        self.assertEqual("REG-COURSE-BOBY-PYTHON CANCEL_ACCEPTED", outputs[4])
+        self.assertEqual(2, len(outputs[5]))
+        self.assertEqual(2, len(engine.course_reg))
+
+    def test_engine_queries(self):
+        engine = Engine()
+        for line in ["ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3",
+                     "ADD-COURSE-OFFERING JAVA JOHN 06062022 1 3",
+                     "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN",
+                     "REGISTER ANDY@GMAIL.COM OFFERING-JAVA-JOHN",
+                     "CANCEL REG-COURSE-ANDY-PYTHON"]:
+            engine.execute(line)
+        self.assertEqual(
+            ("REG-COURSE-ANDY-JAVA ANDY@GMAIL.COM OFFERING-JAVA-JOHN",),
+            engine.execute("LIST-REGISTRATIONS ANDY@GMAIL.COM"))
+        self.assertEqual(
+            ("OFFERING-PYTHON-JOHN PYTHON JOHN 05062022",
+             "OFFERING-JAVA-JOHN JAVA JOHN 06062022"),
+            engine.execute("LIST-OFFERINGS-BY-INSTRUCTOR JOHN"))
+        self.assertEqual(
+            ("OFFERING-JAVA-JOHN JAVA JOHN 06062022",),
+            engine.execute("LIST-OFFERINGS-BY-DATE 06062022"))
+        self.assertEqual((), engine.execute("LIST-REGISTRATIONS BOB@GMAIL.COM"))
+
+    def test_indexes_built_on_first_query(self):
+        engine = Engine()
+        engine.execute("ADD-COURSE-OFFERING PY JOHN 05062022 1 3")
+        engine.execute("REGISTER A@X.COM OFFERING-PY-JOHN")
+        self.assertIsNone(engine.indexes)
+        self.assertEqual(("REG-COURSE-A-PY A@X.COM OFFERING-PY-JOHN",),
+                         engine.execute("LIST-REGISTRATIONS A@X.COM"))
+        engine.execute("CANCEL REG-COURSE-A-PY")
+        engine.execute("ADD-COURSE-OFFERING GO JOHN 06062022 1 3")
+        self.assertEqual((), engine.execute("LIST-REGISTRATIONS A@X.COM"))
+        self.assertEqual(2, len(engine.execute(
+            "LIST-OFFERINGS-BY-INSTRUCTOR JOHN")))
+
+    def test_query_order_after_restore(self):
+        commands = ["ADD-COURSE-OFFERING GO A 05062022 1 2",
+                    "ADD-COURSE-OFFERING ML A 05062022 1 2",
+                    "LIST-OFFERINGS-BY-INSTRUCTOR A",
+                    "ADD-COURSE-OFFERING GO A 03062022 1 2",
+                    "ADD-COURSE-OFFERING JS A 03062022 1 2"]
+        queries = ["LIST-OFFERINGS-BY-INSTRUCTOR A",
+                   "LIST-OFFERINGS-BY-DATE 03062022"]
+        engine = Engine()
+        list(engine.execute_many(commands))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.snapshot")
+            snapshot.dump(engine=engine, path=path,
+                          lines_applied=len(commands))
+            restored, _ = snapshot.load(path=path)
+        self.assertEqual(list(engine.execute_many(queries)),
+                         list(restored.execute_many(queries)))
+        self.assertEqual("OFFERING-GO-A GO A 03062022",
+                         engine.execute(queries[1])[0])
+
+    def test_ids(self):
+        ids.cache_clear()
+        engine = Engine()
+        engine.execute("ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3")
+        engine.execute("ADD-COURSE-OFFERING JAVA JOHN 05062022 1 3")
+        engine.execute("REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN")
+        engine.execute("REGISTER ANDY@GMAIL.COM OFFERING-JAVA-JOHN")
+        self.assertEqual("REG-COURSE-ANDY-JAVA",
+                         ids.registration_id("ANDY@GMAIL.COM", "JAVA"))
+        hits, misses, rate = ids.cache_stats()["employee_name"]
+        self.assertEqual((2, 1), (hits, misses))
+        python, java = engine.courses.values()
+        self.assertIs(python.instructor, java.instructor)
+        self.assertIs(python.date, java.date)
+        registrations = list(engine.course_reg.values())
+        self.assertIs(next(iter(engine.courses)), registrations[0].course_id)
+        self.assertIn("employee_name", Metrics().summary())
+
+    def test_export(self):
+        engine = Engine()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "allotments")
+            with export.AllotmentExport(path=path, batch_size=2) as exporter:
+                engine.exporter = exporter
+                with open("sample_input/input1.txt") as file_handle:
+                    lines = [line for output in engine.execute_many(
+                                 file_handle) if not isinstance(output, str)
+                             for line in output]
+            columns = export.read(path)
+        rows = [" ".join(row) for row in
+                zip(*(columns[name] for name in export.COLUMNS))]
+        self.assertEqual(lines, rows)
+
+    def test_compiled(self):
+        lines = ["ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3\n",
+                 "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN\n",
+                 "REGISTER ANDY@GMAIL.COM\n",
+                 "ALLOT OFFERING-PYTHON-JOHN\n"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "commands.bin")
+            self.assertEqual(4, compiled.compile_file(lines=lines, path=path))
+            commands = list(compiled.commands(path=path))
+            outputs = list(Engine().execute_parsed(commands))
+        self.assertEqual([utils.parse_line(line) for line in lines], commands)
+        self.assertEqual(list(Engine().execute_many(lines)), outputs)
+
+    def test_batch_glob_outside_repo(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                with open("in.txt", "w") as file_handle:
+                    file_handle.write(
+                        "ADD-COURSE-OFFERING PY JOHN 05062022 1 3\n")
+                paths = batch.expand(["*.txt"])
+                batch.run(paths=paths, workers=1)
+                with open("in.txt.out") as file_handle:
+                    self.assertEqual("OFFERING-PY-JOHN\n",
+                                     file_handle.read())
+                # plain paths are read from the repository, and so are
+                # written next to the input there
+                plain = os.path.join("sample_input", "input1.txt")
+                [(_, output_path, *_)] = batch.run(
+                    paths=batch.expand([plain]), workers=1)
+                try:
+                    self.assertEqual(
+                        utils.validate_path(plain) + ".out", output_path)
+                    self.assertTrue(os.path.isfile(output_path))
+                finally:
+                    os.remove(output_path)
+            finally:
+                os.chdir(cwd)
+        self.assertTrue(os.path.isabs(paths[0]))
+
+    def test_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = batch.expand([os.path.join("sample_input", "input*.txt")])
+            results = batch.run(paths=paths, workers=2,
+                                output_dir=directory)
+            self.assertEqual(paths, [result[0] for result in results])
+            for path, output_path, commands, errors, _ in results:
+                with open(path) as file_handle:
+                    expected_output = [
+                        output if isinstance(output, str) else
+                        "\n".join(output)
+                        for output in Engine().execute_many(file_handle)]
+                with open(output_path) as file_handle:
+                    self.assertEqual("\n".join(expected_output) + "\n",
+                                     file_handle.read())
+                self.assertEqual(len(expected_output), commands)
+        self.assertEqual(len(paths) + 2,
+                         len(batch.summary(results=results, seconds=0)))
+
+    def test_archive(self):
+        commands = [
+            "ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3",
+            "ADD-COURSE-OFFERING JAVA JOHN 05062022 2 3",
+            "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "REGISTER WOO@GMAIL.COM OFFERING-JAVA-JOHN",
+            "ALLOT OFFERING-PYTHON-JOHN",
+            "ALLOT OFFERING-JAVA-JOHN",
+            "CANCEL REG-COURSE-ANDY-PYTHON",
+            "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "LIST-REGISTRATIONS ANDY@GMAIL.COM",
+            "REGISTER BOB@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "ALLOT OFFERING-PYTHON-JOHN",
+            "CANCEL REG-COURSE-WOO-JAVA",
+        ]
+        expected_output = list(Engine().execute_many(commands))
+        with tempfile.TemporaryDirectory() as directory:
+            archive = Archive(path=os.path.join(directory, "archive.db"),
+                              cache_size=1)
+            engine = Engine(courses=archive.courses,
+                            course_reg=archive.course_reg)
+            engine.archive = archive
+            self.assertEqual(expected_output,
+                             list(engine.execute_many(commands)))
+            self.assertEqual(["OFFERING-JAVA-JOHN"], list(engine.courses))
+            self.assertEqual([], list(engine.course_reg))
+            archive.close()
+        # an archived offering added again keeps its position
+        commands = [
+            "ADD-COURSE-OFFERING GO A 05062022 1 3",
+            "ADD-COURSE-OFFERING PY B 05062022 1 3",
+            "REGISTER X@Y.COM OFFERING-GO-A",
+            "ALLOT OFFERING-GO-A",
+            "ADD-COURSE-OFFERING GO A 06062022 1 3",
+            "REGISTER Z@Y.COM OFFERING-GO-A",
+            "ALLOT-ALL",
+        ]
+        expected_output = [output if isinstance(output, str) else list(output)
+                           for output in Engine().execute_many(commands)]
+        with tempfile.TemporaryDirectory() as directory:
+            archive = Archive(path=os.path.join(directory, "archive.db"))
+            engine = Engine(courses=archive.courses,
+                            course_reg=archive.course_reg)
+            engine.archive = archive
+            self.assertEqual(expected_output, [
+                output if isinstance(output, str) else list(output)
+                for output in engine.execute_many(commands)])
+            archive.close()
+        # queries merge archived records, read from the database, with the
+        # indexed ones in memory
+        commands = [
+            "ADD-COURSE-OFFERING GO A 05062022 1 3",
+            "ADD-COURSE-OFFERING PY A 05062022 1 3",
+            "ADD-COURSE-OFFERING JS B 05062022 1 3",
+            "REGISTER X@Y.COM OFFERING-GO-A",
+            "REGISTER X@Y.COM OFFERING-PY-A",
+            "LIST-OFFERINGS-BY-INSTRUCTOR A",
+            "ALLOT OFFERING-GO-A",
+            "REGISTER X@Y.COM OFFERING-JS-B",
+            "LIST-REGISTRATIONS X@Y.COM",
+            "LIST-OFFERINGS-BY-INSTRUCTOR A",
+            "REGISTER Z@Y.COM OFFERING-GO-A",
+            "ADD-COURSE-OFFERING PY A 06062022 1 3",
+            "ALLOT OFFERING-PY-A",
+            "LIST-OFFERINGS-BY-DATE 05062022",
+            "LIST-OFFERINGS-BY-DATE 06062022",
+            "LIST-REGISTRATIONS X@Y.COM",
+        ]
+        expected_output = [output if isinstance(output, str) else list(output)
+                           for output in Engine().execute_many(commands)]
+        with tempfile.TemporaryDirectory() as directory:
+            archive = Archive(path=os.path.join(directory, "archive.db"))
+            engine = Engine(courses=archive.courses,
+                            course_reg=archive.course_reg)
+            engine.archive = archive
+            self.assertEqual(expected_output, [
+                output if isinstance(output, str) else list(output)
+                for output in engine.execute_many(commands)])
+            # the archived offering stays out of the indexes
+            self.assertEqual(["OFFERING-PY-A"],
+                             list(engine.indexes.by_instructor["A"]))
+            archive.close()
+
+    def test_waitlist(self):
+        engine = Engine()
+        engine.waitlists = Waitlists()
+        outputs = [engine.execute(line) for line in [
+            "ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 1",
+            "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "REGISTER WOO@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "REGISTER BOB@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "REGISTER WOO@GMAIL.COM OFFERING-PYTHON-JOHN",
+            "CANCEL REG-COURSE-WOO-PYTHON",
+            "CANCEL REG-COURSE-ANDY-PYTHON",
+        ]]
+        self.assertEqual("REG-COURSE-WOO-PYTHON WAITLISTED", outputs[2])
+        self.assertEqual(Constants.STATUS_DUPLICATE, outputs[4])
+        self.assertEqual("REG-COURSE-WOO-PYTHON CANCEL_ACCEPTED", outputs[5])
+        self.assertEqual(("REG-COURSE-ANDY-PYTHON CANCEL_ACCEPTED",
+                          "REG-COURSE-BOB-PYTHON ACCEPTED"), outputs[6])
+        self.assertEqual(["REG-COURSE-BOB-PYTHON"], list(engine.course_reg))
+        self.assertEqual(0, len(engine.waitlists))
+
+    def test_waitlist_dropped_on_allot(self):
+        engine = Engine()
+        engine.waitlists = Waitlists()
+        outputs = [engine.execute(line) for line in [
+            "ADD-COURSE-OFFERING PY JOHN 05062022 1 1",
+            "ADD-COURSE-OFFERING PY BOB 05062022 1 1",
+            "REGISTER A@X.COM OFFERING-PY-JOHN",
+            "REGISTER B@X.COM OFFERING-PY-JOHN",
+            "ALLOT OFFERING-PY-JOHN",
+            "CANCEL REG-COURSE-B-PY",
+            "REGISTER B@X.COM OFFERING-PY-BOB",
+        ]]
+        self.assertEqual("REG-COURSE-B-PY WAITLISTED", outputs[3])
+        self.assertEqual("REG-COURSE-B-PY CANCEL_REJECTED", outputs[5])
+        self.assertEqual("REG-COURSE-B-PY ACCEPTED", outputs[6])
+        self.assertEqual(0, len(engine.waitlists))
+
+    def test_pipeline(self):
+        lines = ["ADD-COURSE-OFFERING PYTHON JOHN 05062022 1 3\n",
+                 "REGISTER ANDY@GMAIL.COM OFFERING-PYTHON-JOHN\n",
+                 "REGISTER ANDY@GMAIL.COM\n",
+                 "ADD-COURSE-OFFERING JAVA JOHN 30022022 1 3\n",
+                 "REGISTER WOO@GMAIL.COM OFFERING-PYTHON-JOHN\n",
+                 "ALLOT OFFERING-PYTHON-JOHN\n",
+                 "CANCEL REG-COURSE-WOO-PYTHON\n"]
+        commands = list(pipeline.commands(lines=lines, workers=2,
+                                          chunk_size=2))
+        self.assertEqual([utils.parse_line(line) for line in lines], commands)
+        self.assertEqual(list(Engine().execute_many(lines)),
+                         list(Engine().execute_parsed(commands)))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+from config import config
+import itertools
+import sys
+
+
+class OutputWriter:
+    def __init__(self, stream=None, buffer_size: int=config.OUTPUT_BUFFER_SIZE,
+                 flush_policy: str=config.FLUSH_AUTO):
+        """Instantiates this class
+
+        Args:
+            stream (file): text stream the output is written to, defaults to
+                stdout.
+            buffer_size (int): number of lines kept in memory before they
+                are written out.
+            flush_policy (str): one of `config.FLUSH_POLICIES`. `auto`
+                flushes whenever the buffer is full, `command` after every
+                command and `end` only when the writer is closed.
+        """
+        assert buffer_size > 0
+        assert flush_policy in config.FLUSH_POLICIES
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.flush_policy = flush_policy
+        self.buffer = []
+        self.__owns_stream = False
+        self.__limit = buffer_size
+        if flush_policy == config.FLUSH_END:
+            self.__limit = sys.maxsize
+
+    @classmethod
+    def open(cls, path: str=None, **kwargs):
+        """Creates a writer for a file path, or for stdout if path is empty
+
+        Args:
+            path (str): output file path.
+
+        Returns:
+            OutputWriter: writer owning the opened file.
+        """
+        if not path or path == config.STDOUT_PATH:
+            return cls(**kwargs)
+        writer = cls(stream=open(path, 'w'), **kwargs)
+        writer.__owns_stream = True
+        return writer
+
+    def write(self, result) -> None:
+        """Buffers the output of one command
+
+        Args:
+            result (str | iterable): a single line, or an iterable of lines
+                which is consumed lazily and never joined in memory. An empty
+                iterable writes an empty line, None writes nothing.
+        """
+        if result is None:
+            return
+        buffer = self.buffer
+        limit = self.__limit
+        if isinstance(result, str):
+            buffer.append(result)
+        else:
+            lines = iter(result)
+            size = len(buffer)
+            buffer.extend(itertools.islice(lines, max(limit - size, 1)))
+            if len(buffer) == size:
+                buffer.append("")
+            while len(buffer) >= limit:
+                self.flush()
+                buffer = self.buffer
+                buffer.extend(itertools.islice(lines, limit))
+        if len(buffer) >= limit or \
+                self.flush_policy == config.FLUSH_COMMAND:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.stream.write("\n".join(self.buffer))
+            self.stream.write("\n")
+            self.buffer = []
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self.__owns_stream:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,7 +1,10 @@
 from config import config
 from utils import exceptions
+import functools
+import itertools
 import os
-import datetime
+import sys
+import types
 
 def validate_args(args: list) -> None:
     err_message = (
@@ -31,66 +34,324 @@ def detect_command(line: str, separator: str=" ") -> list:
     args = line.split(sep=separator)
     return args
 
-def _validate_add(args: list, command: str) -> None:
-    if command != config.ADD:
-        return
-    err_message = ""
+_COMMAND_ERROR = (
+    "Please specify a valid command and ensure its argument"
+    " are in correct order. List of valid commands and the"
+    f" parameters they support:\n{config.SUPPORTED_COMMANDS}"
+)
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+@functools.lru_cache(maxsize=config.DATE_CACHE_SIZE)
+def valid_date(date: str) -> bool:
+    """Checks a ddmmyyyy date without building a datetime
+
+    Results are cached, input files repeat the same few dates.
+    """
+    if len(date) != 8:
+        return False
     try:
-        _date, _min, _max = args[-3], args[-2], args[-1]
-        err_message = "Minimum one enrollment must be done"
-        assert _min >= 1
-        err_message = "Max employees can not be less than min employees"
-        assert _min <= _max
-        err_message = "Date should be specified in ddmmyyyy format"
-        assert len(_date) == 8
-        _ = datetime.datetime(day=int(_date[:2]),
-                                month=int(_date[2:4]),
-                                year=int(_date[4:]))
-    except AssertionError:
-        raise exceptions.INPUT_DATA_ERROR(message=err_message)
-    except Exception as err:
-        raise exceptions.INPUT_DATA_ERROR(message=err)
+        day, month, year = int(date[:2]), int(date[2:4]), int(date[4:])
+    except ValueError:
+        return False
+    if not (1 <= year <= 9999 and 1 <= month <= 12):
+        return False
+    leap_day = month == 2 and year % 4 == 0 and \
+        (year % 100 != 0 or year % 400 == 0)
+    return 1 <= day <= _DAYS_IN_MONTH[month - 1] + leap_day
 
-def validate_command(args: list) -> list:
+def _check_add(args: list) -> bool:
+    _date, _min, _max = args[-3], args[-2], args[-1]
+    return 1 <= _min <= _max and valid_date(_date)
+
+@functools.lru_cache(maxsize=config.INTERN_CACHE_SIZE)
+def _intern(value: str) -> str:
+    """Stripped and interned value of a raw argument
+
+    Results are cached, the interned arguments repeat from line to line.
+    """
+    return sys.intern(value.strip())
+
+# converter applied to each argument, by the type declared for it in config
+_CONVERTERS = {str: str.strip, int: int}
+# positions of the arguments whose values repeat from line to line, titles,
+# instructors, dates and offering ids, which are interned so records share
+# one object per value. Emails and registration ids are mostly distinct,
+# interning them costs time and grows the interned strings table for nothing
+_INTERNED = {
+    config.ADD: (0, 1, 2),
+    config.REGISTER: (1,),
+    config.ALLOT: (0,),
+}
+# per command validation run on the converted arguments
+_CHECKS = {config.ADD: _check_add}
+# command name -> (number of arguments, converters, check), built once
+_COMMAND_TABLE = {
+    name: (len(types),
+           tuple(_intern if index in _INTERNED.get(name, ()) else
+                 _CONVERTERS[typ] for index, typ in enumerate(types)),
+           _CHECKS.get(name))
+    for name, types in config.COMMANDS_METADATA.items()
+}
+
+def convert_command(args: list):
+    """Converts and validates already tokenized command arguments
+
+    Args:
+        args (list): command name followed by its raw arguments.
+
+    Returns:
+        list: converted arguments, or None if the command is invalid.
+    """
+    spec = _COMMAND_TABLE.get(args[0])
+    if spec is None:
+        return None
+    arity, converters, check = spec
+    if len(args) - 1 != arity:
+        return None
     try:
-        cmd_name = args[0]
-        updated_args = args[1:]
-        cmd_metadata = config.COMMANDS_METADATA.get(cmd_name)
-        err_message = (
-            "Please specify a valid command and ensure its argument"
-            " are in correct order. List of valid commands and the"
-            f" parameters they support:\n{config.SUPPORTED_COMMANDS}"
-        )
-        assert cmd_metadata
-        assert len(cmd_metadata) == len(updated_args)
-
-        updated_args = [
-            typ(val.strip()) if not isinstance(val, typ) else val.strip() \
-                for typ, val in zip(cmd_metadata, updated_args)
-        ]
-
-        _validate_add(args=updated_args, command=cmd_name)
-        return cmd_name, updated_args
-    except AssertionError:
-        raise exceptions.INPUT_DATA_ERROR(message=err_message)
-    except Exception as err:
-        raise err
+        params = [convert(value)
+                  for convert, value in zip(converters, args[1:])]
+    except ValueError:
+        return None
+    if check is not None and not check(params):
+        return None
+    return params
 
-def parse_file(arguments):
-    validate_args(args=arguments)
+def parse_line(line: str, separator: str=" "):
+    """Tokenizes, converts and validates one input line
+
+    This is the fast path used by the engine; invalid lines return None
+    instead of raising.
+
+    Args:
+        line (str): raw command line.
+
+    Returns:
+        tuple: command name and converted arguments, or None.
+    """
+    args = line.rstrip("\r\n").split(separator)
+    params = convert_command(args)
+    if params is None:
+        return None
+    return args[0], params
+
+def validate_command(args: list) -> list:
+    params = convert_command(args)
+    if params is None:
+        raise exceptions.INPUT_DATA_ERROR(message=_COMMAND_ERROR)
+    return args[0], params
+
+# options of a plain `geektrust <path>` run
+_DEFAULT_OPTIONS = {
+    "output": config.STDOUT_PATH,
+    "buffer_size": config.OUTPUT_BUFFER_SIZE,
+    "flush": config.FLUSH_AUTO,
+    "workers": 1,
+    "snapshot": None,
+    "journal": None,
+    "metrics": False,
+    "serve": None,
+    "export": None,
+    "compile": None,
+    "batch": None,
+    "output_dir": None,
+    "shared_state": False,
+    "archive": None,
+    "waitlist": False,
+    "parse_workers": 1,
+}
+
+def _build_parser():
+    # argparse is imported on demand, importing it costs more than a small
+    # input file takes to run
+    import argparse
+    
+    class ArgumentParser(argparse.ArgumentParser):
+        def error(self, message):
+            raise exceptions.INPUT_DATA_ERROR(message=message)
+
+    def positive_int(value: str) -> int:
+        number = int(value)
+        if number < 1:
+            raise argparse.ArgumentTypeError(
+                f"{value} is not a positive integer")
+        return number
+
+    parser = ArgumentParser(prog="geektrust")
+    parser.add_argument(
+        "path", nargs="?",
+        help=f"input file path, or {config.STDIN_PATH} for stdin")
+    parser.add_argument(
+        "-o", "--output",
+        help=f"output file path, or {config.STDOUT_PATH} for stdout")
+    parser.add_argument(
+        "--buffer-size", type=positive_int,
+        help="number of output lines buffered before a write")
+    parser.add_argument(
+        "--flush", choices=config.FLUSH_POLICIES,
+        help="when buffered output is flushed")
+    parser.add_argument(
+        "--workers", type=positive_int,
+        help="processes running independent course titles in parallel")
+    parser.add_argument(
+        "--snapshot",
+        help="state snapshot restored at startup when it exists, the lines it"
+             " already covers are skipped, and written back at the end")
+    parser.add_argument(
+        "--journal",
+        help="directory of a crash-safe journal of accepted state changes,"
+             " the state it holds is recovered at startup")
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="print per command counts, timings and latency histograms to"
+             " stderr at exit, and on SIGUSR1")
+    parser.add_argument(
+        "--serve", metavar="SOCKET",
+        help="keep running and execute command batches sent to this unix"
+             f" socket, or read from stdin with {config.STDIN_PATH}")
+    parser.add_argument(
+        "--export",
+        help="also write every allotment to this columnar file, Parquet when"
+             " pyarrow is installed and a NumPy .npz archive otherwise")
+    parser.add_argument(
+        "--compile", metavar="COMPILED",
+        help="validate the input once and write it to this compiled file,"
+             " which can then be run in place of the input, instead of"
+             " running it")
+    parser.add_argument(
+        "--batch", nargs="+", metavar="PATTERN",
+        help="run these input files or glob patterns, each to its own output"
+             f" file ending in {config.BATCH_OUTPUT_SUFFIX}, and write a"
+             " summary to the output")
+    parser.add_argument(
+        "--output-dir",
+        help="directory of the batch output files, next to the inputs by"
+             " default")
+    parser.add_argument(
+        "--shared-state", action="store_true",
+        help="run the batch files one after the other on the same state"
+             " instead of concurrently on fresh states")
+    parser.add_argument(
+        "--archive",
+        help="sqlite database alloted offerings and their registrations are"
+             " moved to, out of memory, recreated on every run")
+    parser.add_argument(
+        "--waitlist", action="store_true",
+        help="queue registrations to full offerings and register the first"
+             " waiter when a cancel frees a slot")
+    parser.add_argument(
+        "--parse-workers", type=positive_int,
+        help="processes parsing and validating the input ahead of the"
+             " commands being run, in order, on a single state")
+    parser.set_defaults(**_DEFAULT_OPTIONS)
+    return parser
+
+def parse_args(arguments: list):
+    """Parses the command line the app was started with
+
+    Args:
+        arguments (list): command line arguments, module name first.
+
+    Returns:
+        argparse.Namespace: parsed options.
+    """
+    if len(arguments) == 2 and (arguments[1] == config.STDIN_PATH or
+                                not arguments[1].startswith("-")):
+        return types.SimpleNamespace(path=arguments[1], **_DEFAULT_OPTIONS)
+    parser = _build_parser()
+    options = parser.parse_args(arguments[1:])
+    if [options.path, options.serve, options.batch].count(None) != 2:
+        parser.error("pass either an input file path, --serve or --batch")
+    if options.batch and (options.snapshot or options.journal or
+                          options.export or options.compile or
+                          options.metrics):
+        parser.error("--batch can not be combined with --snapshot,"
+                     " --journal, --export, --compile or --metrics")
+    if options.archive and (options.snapshot or options.journal or
+                            options.workers > 1 or options.serve or
+                            options.batch or options.compile):
+        parser.error("--archive can not be combined with --snapshot,"
+                     " --journal, --workers, --serve, --batch or --compile")
+    if options.waitlist and (options.workers > 1 or options.serve or
+                             options.batch):
+        parser.error("--waitlist can not be combined with --workers, --serve"
+                     " or --batch")
+    if options.parse_workers > 1 and (options.workers > 1 or options.serve or
+                                      options.batch or options.compile):
+        parser.error("--parse-workers can not be combined with --workers,"
+                     " --serve, --batch or --compile")
+    if (options.output_dir or options.shared_state) and not options.batch:
+        parser.error("--output-dir and --shared-state need --batch")
+    if options.snapshot and options.workers > 1:
+        parser.error("--snapshot can not be combined with --workers")
+    if options.journal and (options.snapshot or options.workers > 1):
+        parser.error("--journal can not be combined with --snapshot or"
+                     " --workers")
+    if options.serve and (options.snapshot or options.journal or
+                          options.workers > 1 or options.export):
+        parser.error("--serve runs every batch on a fresh state and can not"
+                     " be combined with --snapshot, --journal, --workers or"
+                     " --export")
+    if options.metrics and (options.workers > 1 or options.serve):
+        parser.error("--metrics can not be combined with --workers or"
+                     " --serve")
+    if options.export and options.workers > 1:
+        parser.error("--export can not be combined with --workers")
+    if options.compile and options.serve:
+        parser.error("--compile needs an input file path")
+    if options.workers > 1 and options.path and is_compiled(options.path):
+        parser.error("a compiled input can not be run with --workers")
+    if options.parse_workers > 1 and options.path and \
+            is_compiled(options.path):
+        parser.error("a compiled input is already parsed and can not be run"
+                     " with --parse-workers")
+    return options
+
+def is_compiled(path: str) -> bool:
+    """Whether an input file is a compiled command file
+
+    Args:
+        path (str): input file path, `-` is stdin and never compiled.
+
+    Returns:
+        bool: True if the file starts with the compiled file magic.
+    """
+    if path == config.STDIN_PATH:
+        return False
+    with open(validate_path(path), "rb") as file_handle:
+        return file_handle.read(len(config.COMPILED_MAGIC)) == \
+            config.COMPILED_MAGIC
+
+def open_input(path: str):
+    """Opens an input file, or stdin, and yields it line by line
+
+    Lines are read lazily, so memory stays flat regardless of input size.
+
+    Args:
+        path (str): input file path, `-` reads commands from stdin.
+
+    Returns:
+        iterator: lines of the input, in order.
+    """
     err_message = (
         "Input file should have valid content."
     )
-    try:
-        file_path = arguments[1]
-        abs_file_path = validate_path(file_path)
+    if path == config.STDIN_PATH:
+        file_handle = sys.stdin
+    else:
+        abs_file_path = validate_path(path)
         file_handle = open(abs_file_path, 'r')
-        lines = file_handle.readlines()
-        assert lines
-        return lines
+    first_line = file_handle.readline()
+    try:
+        assert first_line
     except AssertionError:
+        file_handle.close()
         raise exceptions.INPUT_DATA_ERROR(message=err_message)
+    return itertools.chain((first_line,), file_handle)
 
-def print_output(result) -> None:
-    res_type = {str: result, tuple: "\n".join(result), list: "\n".join(result)}
-    print(res_type.get(type(result)))
+def stream_file(arguments):
+    validate_args(args=arguments)
+    return open_input(path=arguments[1])
+
+def parse_file(arguments):
+    return list(stream_file(arguments=arguments))